@@ -1,5 +1,7 @@
 import random
 import os
+import itertools
+from threading import Lock
 import re
 import secrets
 import html
@@ -11,7 +13,10 @@ from game_context import GameContext
 from elements import ElementFactory
 from player import Player
 
-from helpers import color_format, get_room_id, get_reserved_words
+from helpers import color_format, arg_colors, parse_template
+from helpers import get_reserved_words
+from utils import make_patch
+from registry import make_registry
 import constants as C
 import concurrency as R
 
@@ -24,7 +29,14 @@ app = Flask(
 )
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', secrets.token_hex(32))
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
-socketio = SocketIO(app, async_handlers=True)
+
+# Workers share rooms (through the registry) and emits (through the Socket.IO
+# message queue) via REDIS_URL if it is set. Otherwise both are kept in this
+# process, and only one worker may run
+REDIS_URL = os.getenv('REDIS_URL')
+socketio = SocketIO(app, async_handlers=True, message_queue=REDIS_URL)
+registry = make_registry(REDIS_URL)
+WORKER_ID = secrets.token_hex(8)
 
 
 # disable caching
@@ -37,17 +49,46 @@ def after_request(response):
     return response
 
 
-# sleep times after socket emissions (to pace frontend)
+# time between frames sent to a room (to pace frontend), and sleep time before
+# AI decisions
 SOCKET_SLEEP = float(os.getenv('SOCKET_SLEEP', 0.25))
 AI_SLEEP = float(os.getenv('AI_SLEEP', 2.0))
 
+# state updates are sent as patches to the previous version, except for every
+# RESYNC_EVERY-th version which is sent whole (in case a client missed one)
+RESYNC_EVERY = int(os.getenv('RESYNC_EVERY', 50))
+
 # rooms are indexed by room_id, with a status, gc, and connections field
 # status is LOBBY or GAME. gc is None if status is LOBBY, otherwise a
 # GameContext object connections is a dict indexed by socket_id whose value is
-# the username of that connection
-# TODO replace with Redis (#209)
+# the username of that connection. Once a game starts, players is a dict
+# indexed by user_id whose value is that Player. host is whether this worker
+# hosts the room (otherwise the room only holds spectators of a game hosted by
+# another worker), and public is the last public state of the room's game
+# (and version its version number). outbox is the queue of the room's sender
+# task while a game is on (see send_frames). templates and palette index the
+# message templates and colors defined for the room's clients so far (see
+# encode_message)
+#
+# The hosting worker shares a record of each room in the registry (see
+# publish_room), which is what the room page reads. rooms itself only holds
+# the live game objects of the rooms this worker hosts or serves
+#
+# Adding and removing rooms takes R.connection_lock, and changing a room takes
+# the room's own lock. Readers take no lock: the connections of a room are
+# replaced rather than modified, so a reader always sees a consistent snapshot
 rooms = {}
 
+# Reverse indexes, kept up to date on join, start, reconnect and disconnect:
+# the room of every connected socket, and the player of every socket that is
+# playing in a game
+sid_rooms = {}
+sid_players = {}
+
+# ask ids, unique across all games, so that answers can be routed to the ask
+# they reply to (and stale answers dropped)
+ask_ids = itertools.count(1)
+
 # APP ROUTES
 
 
@@ -93,35 +134,33 @@ def room(methods=['GET', 'POST']):
             return redirect('/')
 
         # check for username taken
-        R.connection_lock.acquire()
-        if (room_id in rooms):
-            if username in rooms[room_id]['connections'].values():
-                flash("Someone in the room has taken your name")
-                R.connection_lock.release()
-                return redirect('/')
+        record = registry.get(room_id)
+        if record and username in record['names']:
+            flash("Someone in the room has taken your name")
+            return redirect('/')
 
         # check for game already in progress
-        if (room_id in rooms) and rooms[room_id]['status'] == 'GAME':
-            public_state, private_state = rooms[room_id]['gc'].dump()
+        if record and record['status'] == 'GAME':
             context = {
                 'name': username,
                 'room_id': room_id,
                 'spectate': True,
                 'reconnect': False,
-                'gc_data': {'public': public_state}
+                'gc_data': {
+                    'public': record['public'],
+                    'version': record['version']
+                }
             }
 
-            # Reconnect to game
-            if username in rooms[room_id]['reconnections']:
+            # Reconnect to game (if this worker hosts it)
+            rm = rooms.get(room_id)
+            if username in record['reconnections'] and rm and rm['host']:
+                private_state = rm['gc'].dump()[1]
                 context['spectate'] = False
                 context['reconnect'] = True
                 context['gc_data']['private'] = [
                     p for p in private_state if p['user_id'] == username][0]
-                ai_player = [p for p in rooms[room_id]
-                             ['gc'].players if p.user_id == username][0]
-            R.connection_lock.release()
             return render_template('room.html', context=context)
-        R.connection_lock.release()
 
         # send player to room
         return render_template('room.html', context={
@@ -139,16 +178,13 @@ def room(methods=['GET', 'POST']):
 def socket_ask(form, data, user_id, room_id):
 
     # Get player
-    R.connection_lock.acquire()
-    if room_id in rooms and rooms[room_id]['gc']:
-        pl = [p for p in rooms[room_id]['gc'].players if p.user_id == user_id]
-        player = pl[0]
+    rm = rooms.get(room_id)
+    if rm and rm['gc']:
+        player = rm['players'][user_id]
     else:
-        R.connection_lock.release()
         if 'Decline' in data['options'] and len(data['options']) > 1:
             data['options'].remove('Decline')
         return {'value': random.choice(data['options'])}
-    R.connection_lock.release()
 
     # If player is a CPU, use the player's piggyback agent to make a choice
     if player.ai:
@@ -157,58 +193,213 @@ def socket_ask(form, data, user_id, room_id):
             data['options'], player=player, gc=player.gc
         )
 
-    # Otherwise, emit ask
+    # Otherwise, register the ask and emit it with its id
     sid = player.socket_id
-    mailbox = rooms[room_id]['gc'].answer_bin
+    pending = player.gc.pending_asks
+    ask_id = next(ask_ids)
+    ask = {
+        'sid': sid,
+        'options': data['options'],
+        'answer': None,
+        'event': socketio.server.eio.create_event()
+    }
+    pending[ask_id] = ask
     data['form'] = form
-    mailbox['answered'] = False
-    socketio.emit('ask', data, room=sid)
-
-    # Loop until an answer is received
-    while not mailbox['answered']:
-        while not mailbox['answered']:
-            # If a player swaps out for an AI during an ask, the piggyback
-            # agent answers for them
-            if player.ai or player.socket_id != sid:
-                socketio.sleep(AI_SLEEP)
-                return player.agent.choose_action(
-                    data['options'], player=player, gc=player.gc
-                )
-            socketio.sleep(SOCKET_SLEEP)
-
-        # Validate answerer and answer
-        invalid_option = mailbox['data']['value'] not in data['options']
-        if mailbox['sid'] != sid or invalid_option:
-            mailbox['answered'] = False
+    data['ask_id'] = ask_id
+    send('ask', data, room_id, sid)
+
+    # Sleep until on_answer delivers a valid answer, or on_disconnect swaps
+    # the player out for an AI
+    try:
+        ask['event'].wait()
+    finally:
+        pending.pop(ask_id, None)
+
+    # If a player swapped out for an AI during the ask, the piggyback agent
+    # answers for them
+    if ask['answer'] is None:
+        socketio.sleep(AI_SLEEP)
+        return player.agent.choose_action(
+            data['options'], player=player, gc=player.gc
+        )
 
     # Return answer
-    mailbox['answered'] = False
-    return mailbox['data']
+    return ask['answer']
+
+
+def send(event, data, room_id, to=None):
+    """Queue an event for the room's sender task, or emit it right away if
+    no game is on in the room"""
+
+    rm = rooms.get(room_id)
+    if rm and rm['outbox']:
+        rm['outbox'].put((event, data, to or room_id))
+    else:
+        socketio.emit(event, data, room=to or room_id)
+
+
+def send_frames(room_id, rm):
+    """Sender task of a room. Emits everything queued in the room's outbox
+    since the last frame as one frame per recipient, a frame at most every
+    SOCKET_SLEEP seconds, until the room closes. So the game loop never waits
+    on the frontend, and pacing is up to the stream of frames."""
+
+    outbox = rm['outbox']
+    empty = socketio.server.eio.get_queue_empty_exception()
+    while True:
+        events = [outbox.get()]
+        while True:
+            try:
+                events.append(outbox.get_nowait())
+            except empty:
+                break
+        closed = None in events
+
+        # Group consecutive events for the same recipient
+        frames = []
+        for event, data, to in make_frame(room_id, rm, events):
+            if not frames or frames[-1][0] != to:
+                frames.append((to, []))
+            frames[-1][1].append([event, data])
+        for to, frame in frames:
+            socketio.emit('frame', frame, room=to)
+
+        if closed:
+            return
+        socketio.sleep(SOCKET_SLEEP)
+
+
+def make_frame(room_id, rm, events):
+    """Return the events to send for the given queued events, merging each
+    state update into the next one unless a display or an ask comes between
+    them (messages and their templates may)"""
+
+    frame = []
+    state = None
+    for e in events:
+        if e is None:
+            continue
+        if e[0] == 'update':
+            state = e[1]
+            continue
+        if e[0] not in ('message', 'templates') and state is not None:
+            frame += make_update(room_id, rm, state)
+            state = None
+        frame.append(e)
+    if state is not None:
+        frame += make_update(room_id, rm, state)
+    return frame
+
+
+def make_update(room_id, rm, data):
+    """Return the update event that brings clients to the given state
+    (none if nothing changed since the last version)"""
+
+    # Send the changes since the last version (if there are any)
+    with rm['lock']:
+        patch = make_patch(rm['public'], data)
+        if not patch:
+            return []
+        rm['public'] = data
+        rm['version'] += 1
+        packet = {'version': rm['version']}
+        if rm['version'] % RESYNC_EVERY:
+            packet['base'] = rm['version'] - 1
+            packet['patch'] = patch
+        else:
+            packet['state'] = data
+    if 'state' in packet and rm['host']:
+        publish_room(room_id, rm)
+    return [('update', packet, room_id)]
+
+
+def encode_message(str, args, gc, room_id, rm):
+    """Return a message packet that gives its template and colors by id:
+    {'t': template id, 'a': args, 'c': palette id of each arg}. Templates and
+    colors the room's clients haven't seen yet are first sent to the whole
+    room in a 'templates' event, and published for other workers (palette id
+    0 is the server color, which colors the text around the args)."""
+
+    colors = [C.TEXT_COLORS['server']] + arg_colors(args, gc)
+    new = {'templates': {}, 'palette': {}}
+    with rm['lock']:
+        t = rm['templates'].get(str)
+        if t is None:
+            t = rm['templates'][str] = len(rm['templates'])
+            new['templates'][t] = parse_template(str)
+        for c in colors:
+            if c not in rm['palette']:
+                rm['palette'][c] = len(rm['palette'])
+                new['palette'][rm['palette'][c]] = c
+        if new['templates'] or new['palette']:
+            send('templates', new, room_id)
+        packet = {'t': t, 'a': list(args),
+                  'c': [rm['palette'][c] for c in colors[1:]]}
+    if (new['templates'] or new['palette']) and rm['host']:
+        publish_room(room_id, rm)
+    return packet
 
 
 def socket_tell(str, args, gc, room_id, client=None):
     if not client:
         client = (room_id,)
-    data = color_format(str, args, gc)
-    packet = {'strings': data[0], 'colors': data[1]}
-    socketio.emit('message', packet, room=client[0])
-    if room_id in rooms and rooms[room_id]['gc']:
-        socketio.sleep(SOCKET_SLEEP)
+
+    # Send templated messages while a game is on, and expanded ones otherwise
+    rm = rooms.get(room_id)
+    if rm and rm['outbox']:
+        packet = encode_message(str, args, gc, room_id, rm)
+    else:
+        data = color_format(str, args, gc)
+        packet = {'strings': data[0], 'colors': data[1]}
+    send('message', packet, room_id, client[0])
 
 
 def socket_show(data, gc, room_id, client=None):
     assert data['type'] in ["die", "win", "reveal", "roll", "draw", "damage"]
     if not client:
         client = (room_id,)
-    socketio.emit('display', data, room=client[0])
-    if room_id in rooms and rooms[room_id]['gc']:
-        socketio.sleep(SOCKET_SLEEP)
+    send('display', data, room_id, client[0])
 
 
 def socket_update(data, room_id):
-    socketio.emit('update', data, room=room_id)
-    if room_id in rooms and rooms[room_id]['gc']:
-        socketio.sleep(SOCKET_SLEEP)
+    send('update', data, room_id)
+
+
+def publish_room(room_id, rm):
+    """Share the record of a room hosted by this worker with all workers. It
+    is published on joins, starts, leaves and whole state versions (every
+    RESYNC_EVERY-th), and takes the room's lock, so call it without holding
+    the lock."""
+
+    with rm['lock']:
+        record = {
+            'status': rm['status'],
+            'names': list(rm['connections'].values()),
+            'reconnections': list(rm['reconnections']),
+            'worker': WORKER_ID,
+            'public': rm['public'],
+            'version': rm['version'],
+            'templates': dict(rm['templates']),
+            'palette': dict(rm['palette'])
+        }
+    registry.put(room_id, record)
+
+
+def template_table(room_id, rm):
+    """Return the message templates and colors defined for a room's clients
+    so far (as recorded in the registry, if another worker hosts the game)"""
+
+    if rm['host']:
+        with rm['lock']:
+            record = {'templates': dict(rm['templates']),
+                      'palette': dict(rm['palette'])}
+    else:
+        record = registry.get(room_id) or {}
+    return {
+        'templates': {t: parse_template(s) for s, t in
+                      record.get('templates', {}).items()},
+        'palette': {i: c for c, i in record.get('palette', {}).items()}
+    }
 
 # SOCKET RECEIVERS
 
@@ -216,20 +407,18 @@ def socket_update(data, room_id):
 @socketio.on('start')
 def on_start(json):
 
-    # Get room and players in it
-    R.connection_lock.acquire()
-    room_id = get_room_id(rooms, request.sid)
-    if not room_id:
-        R.connection_lock.release()
+    # Get room and a snapshot of the players in it
+    room_id = sid_rooms.get(request.sid)
+    rm = rooms.get(room_id)
+    if not rm or not rm['host'] or rm['status'] == 'GAME':
         return
 
-    people_in_room = rooms[room_id]['connections']
+    people_in_room = rm['connections']
     names_and_sids = [(people_in_room[x], x) for x in people_in_room.keys()]
 
     # Check for false start
     n_players = max(min(int(json['n_players']), 8), 4)
     if len(names_and_sids) > n_players:
-        R.connection_lock.release()
         packet = {'field': n_players, 'actual': len(names_and_sids)}
         socketio.emit('false_start', packet, room=request.sid)
         return
@@ -244,7 +433,8 @@ def on_start(json):
                   for i in range(1, n_players - len(human_players) + 1)]
     players = human_players + ai_players
 
-    # Initialize game context with players and emission functions
+    # Initialize game context with players and emission functions (outside
+    # of any lock, as this is the expensive part)
     ef = ElementFactory()
     gc = GameContext(
         players=players,
@@ -262,22 +452,36 @@ def on_start(json):
     gc.show_h = lambda x, *y: socket_show(x, gc, room_id, y)
     gc.update_h = lambda: socket_update(gc.dump()[0], room_id)
 
-    # Assign game to room
-    if rooms[room_id]['status'] == 'GAME':
-        R.connection_lock.release()
-        return
-    rooms[room_id]['gc'] = gc
-    rooms[room_id]['status'] = 'GAME'
-
-    R.connection_lock.release()
+    # Assign game to room, unless someone else started a game or the room
+    # changed in the meantime (then start over from the new snapshot)
+    with rm['lock']:
+        if rm['status'] == 'GAME' or rm['closed']:
+            return
+        stale = rm['connections'] is not people_in_room
+        if not stale:
+            rm['gc'] = gc
+            rm['players'] = {p.user_id: p for p in players}
+            rm['status'] = 'GAME'
+            rm['outbox'] = socketio.server.eio.create_queue()
+            for p in human_players:
+                sid_players[p.socket_id] = p
+    if stale:
+        return on_start(json)
+    socketio.start_background_task(send_frames, room_id, rm)
 
     # Send public and private game states to frontend
     gc.tell_h("Loading game...", [])
     public_state, private_state = gc.dump()
+    with rm['lock']:
+        rm['public'] = public_state
+        rm['version'] += 1
+        version = rm['version']
+    publish_room(room_id, rm)
     for priv in private_state:
         data = {
             'public': public_state,
-            'private': priv
+            'private': priv,
+            'version': version
         }
         socketio.emit('game_start', data, room=priv['socket_id'])
     socketio.sleep(1)
@@ -288,107 +492,120 @@ def on_start(json):
     gc.play()
 
 
-@socketio.on('reveal')
-def on_reveal():
+@socketio.on('templates')
+def on_templates():
+
+    # Send the room's message templates and colors to a client that got a
+    # message using ones it doesn't have
+    room_id = sid_rooms.get(request.sid)
+    rm = rooms.get(room_id)
+    if rm:
+        socketio.emit('templates', template_table(room_id, rm),
+                      room=request.sid)
 
-    # Get room
-    R.connection_lock.acquire()
-    room_id = get_room_id(rooms, request.sid)
 
-    # Make sure room and game still exist
-    if room_id and rooms[room_id]['gc']:
-        player = [p for p in rooms[room_id]
-                  ['gc'].players if p.socket_id == request.sid][0]
+@socketio.on('resync')
+def on_resync():
+
+    # Get the room's latest state (from the registry if another worker
+    # hosts its game)
+    room_id = sid_rooms.get(request.sid)
+    rm = rooms.get(room_id)
+    if not rm:
+        return
+    if rm['host']:
+        with rm['lock']:
+            packet = {'version': rm['version'], 'state': rm['public']}
     else:
-        R.connection_lock.release()
+        record = registry.get(room_id) or {}
+        packet = {'version': record.get('version'),
+                  'state': record.get('public')}
+
+    # Send the whole state to the client that missed an update
+    if packet['state'] is not None:
+        socketio.emit('update', packet, room=request.sid)
+
+
+@socketio.on('reveal')
+def on_reveal():
+
+    # Get player, and make sure they're in a game
+    player = sid_players.get(request.sid)
+    if not player:
         return
 
     # Reveal them (if they're alive and unrevealed)
-    R.connection_lock.release()
-    R.reveal_lock.acquire()
+    player.gc.reveal_lock.acquire()
     if player.state == C.PlayerState.Hidden:
         player.state = C.PlayerState.Revealed  # Guard
-        R.reveal_lock.release()
+        player.gc.reveal_lock.release()
         player.reveal()
     else:
-        R.reveal_lock.release()
+        player.gc.reveal_lock.release()
 
 
 @socketio.on('special')
 def on_special():
 
-    # Get room
-    R.connection_lock.acquire()
-    room_id = get_room_id(rooms, request.sid)
-
-    # Make sure room and game still exist
-    if room_id and rooms[room_id]['gc']:
-        player = [p for p in rooms[room_id]
-                  ['gc'].players if p.socket_id == request.sid][0]
-    else:
-        R.connection_lock.release()
+    # Get player, and make sure they're in a game
+    player = sid_players.get(request.sid)
+    if not player:
         return
-    R.connection_lock.release()
 
     # Use special
-    R.reveal_lock.acquire()
+    player.gc.reveal_lock.acquire()
     if player.state == C.PlayerState.Revealed and not player.special_active:
         player.special_active = True  # Guard
-        R.reveal_lock.release()
+        player.gc.reveal_lock.release()
         msg = "You've activated your special ability."
         msg += " It will take effect next time its use conditions are met."
         player.gc.tell_h(msg, [], request.sid)
-        player.character.special(rooms[room_id]['gc'], player, turn_pos='now')
-        rooms[room_id]['gc'].update_h()
+        player.character.special(player.gc, player, turn_pos='now')
+        player.gc.update_h()
     else:
-        R.reveal_lock.release()
+        player.gc.reveal_lock.release()
 
 
 @socketio.on('answer')
 def on_answer(json):
 
-    # Make sure an answer isn't already being processed
-    R.connection_lock.acquire()
-    room_id = get_room_id(rooms, request.sid)
-
-    # Define some checks (functions, not booleans, to preserve short-circuit)
-    def not_in_game(rid):
-        return rooms[rid]['status'] != 'GAME'
+    # Find the ask this answers
+    player = sid_players.get(request.sid)
+    rm = rooms.get(sid_rooms.get(request.sid))
+    if not player or not rm:
+        return
+    ask = player.gc.pending_asks.get(json.get('ask_id'))
+    if not ask:
+        return
 
-    def room_bin_answered(rid):
-        rooms[room_id]['gc'].answer_bin['answered']
+    with rm['lock']:
 
-    if not room_id or not_in_game(room_id) or room_bin_answered(room_id):
-        R.connection_lock.release()
-        return
-    bin = rooms[room_id]['gc'].answer_bin
+        # Drop stale, duplicate, misdirected and invalid answers
+        if (ask['answer'] is not None or ask['sid'] != request.sid
+                or json.get('value') not in ask['options']):
+            return
 
-    # Fill answer bin
-    bin['data'] = json
-    bin['sid'] = request.sid
-    bin['answered'] = True
-    R.connection_lock.release()
+        # Deliver the answer and wake up the waiting ask
+        ask['answer'] = {'value': json['value']}
+        ask['event'].set()
 
 
 @socketio.on('message')
 def on_message(json):
 
     # Message fields
-    R.connection_lock.acquire()
-    room_id = get_room_id(rooms, request.sid)
-    if not room_id:
-        R.connection_lock.release()
+    room_id = sid_rooms.get(request.sid)
+    rm = rooms.get(room_id)
+    if not rm or request.sid not in rm['connections']:
         return
-    json['name'] = rooms[room_id]['connections'][request.sid]
+    json['name'] = rm['connections'][request.sid]
 
     # If player is not in game, or spectating, their color is grey
-    if (rooms[room_id]['status'] != 'GAME') or (request.sid not in [
-            p.socket_id for p in rooms[room_id]['gc'].players]):
+    player = sid_players.get(request.sid)
+    if not player:
         json['color'] = C.TEXT_COLORS['server']
     else:
-        json['color'] = [p.color for p in rooms[room_id]
-                         ['gc'].players if p.socket_id == request.sid][0]
-    R.connection_lock.release()
+        json['color'] = player.color
 
     # Broadcast non-empty message
     if 'data' in json and json['data'].strip():
@@ -413,94 +630,143 @@ def on_join(json):
         msg = '{} has rejoined the room!'
     socket_tell(msg, [name], None, room_id)
 
-    # Create room if it doesn't exist and add player to room
-    R.connection_lock.acquire()
-    if room_id not in rooms:
-        if spectate or reconnect:
-            R.connection_lock.release()
+    # Create room if it doesn't exist (or is closing) and add player to room.
+    # A room that another worker hosts can only be joined as a spectator
+    while True:
+        with R.connection_lock:
+            rm = rooms.get(room_id)
+            if rm and rm['closed']:
+                rooms.pop(room_id)
+                if rm['host']:
+                    registry.delete(room_id)
+                rm = None
+            if not rm:
+                new_record = {'status': 'LOBBY', 'names': [],
+                              'reconnections': [], 'worker': WORKER_ID,
+                              'public': None, 'version': 0, 'templates': {},
+                              'palette': {}}
+                host = not (spectate or reconnect) and registry.create(
+                    room_id, new_record)
+                if host or (spectate and registry.get(room_id)):
+                    rm = rooms[room_id] = {
+                        'status': 'LOBBY', 'gc': None, 'connections': {},
+                        'reconnections': {}, 'players': {}, 'lock': Lock(),
+                        'closed': False, 'host': host, 'public': None,
+                        'version': 0, 'outbox': None, 'templates': {},
+                        'palette': {}
+                    }
+        if not rm:
             socketio.disconnect(request.sid)
             return
-        rooms[room_id] = {'status': 'LOBBY', 'gc': None,
-                          'connections': {}, 'reconnections': {}}
-
-    # If this is a reconnection event, change player's socket id and AI status
-    # in game context
-    if reconnect:
-        del rooms[room_id]['reconnections'][name]
-        player = [p for p in rooms[room_id]
-                  ['gc'].players if p.user_id == name][0]
-        player.socket_id = request.sid
-        player.ai = False
-
-    # Add new player to room
-    rooms[room_id]['connections'][request.sid] = name
+
+        with rm['lock']:
+            if rm['closed']:
+                continue
+
+            # If this is a reconnection event, change player's socket id and
+            # AI status in game context
+            if reconnect:
+                del rm['reconnections'][name]
+                player = rm['players'][name]
+                player.socket_id = request.sid
+                player.ai = False
+                sid_players[request.sid] = player
+
+            # Add new player to room
+            connections = dict(rm['connections'])
+            connections[request.sid] = name
+            rm['connections'] = connections
+            sid_rooms[request.sid] = room_id
+            break
     join_room(room_id)
-    R.connection_lock.release()
+    if rm['host']:
+        publish_room(room_id, rm)
+
+    # Define the room's message templates and colors for the newcomer (any
+    # defined from now on reach them with the rest of the room)
+    table = template_table(room_id, rm)
+    if table['templates']:
+        socketio.emit('templates', table, room=request.sid)
 
     # Emit welcome message to new player
-    msg = 'Welcome to Shadow Hunters Room: ' + room_id
+    msg = 'Welcome to Shadow Hunters Room: {}'
     if spectate:
-        msg = 'You are now spectating Shadow Hunters Room: ' + room_id
+        msg = 'You are now spectating Shadow Hunters Room: {}'
     elif reconnect:
-        msg = 'You\'ve rejoined your game in Shadow Hunters Room: ' + room_id
-    socket_tell(msg, [], None, room_id, client=(request.sid,))
+        msg = 'You\'ve rejoined your game in Shadow Hunters Room: {}'
+    socket_tell(msg, [room_id], None, room_id, client=(request.sid,))
 
     # Tell player about other room members
-    members = [x for x in rooms[room_id]['connections'].values() if x != name]
-    msg = 'There\'s no one else here!'
-    if members:
-        msg = 'Other players in the room: ' + ', '.join(members)
-    if not reconnect:
-        socket_tell(msg, [], None, room_id, client=(request.sid,))
+    members = [x for x in rm['connections'].values() if x != name]
+    if not reconnect and members:
+        socket_tell('Other players in the room: {}', [', '.join(members)],
+                    None, room_id, client=(request.sid,))
+    elif not reconnect:
+        socket_tell('There\'s no one else here!', [], None, room_id,
+                    client=(request.sid,))
 
 
 @socketio.on('disconnect')
 def on_disconnect():
 
     # Get room_id, name, and game context
-    room_id = get_room_id(rooms, request.sid)
-    name = rooms[room_id]['connections'][request.sid]
-    gc = rooms[room_id]['gc']
+    room_id = sid_rooms[request.sid]
+    rm = rooms[room_id]
+    name = rm['connections'][request.sid]
+    gc = rm['gc']
     socket_tell('{} has left the room', [name], gc, room_id)
 
     # Remove user from the room
-    R.connection_lock.acquire()
-    rooms[room_id]['connections'].pop(request.sid)
-
-    # Close room if it is now empty, or replace player with AI if it's in game
-    if not rooms[room_id]['connections'].keys():
-
-        # Close the room
-        if gc and [p for p in gc.players if p.socket_id == request.sid]:
-            [p for p in gc.players if p.socket_id == request.sid][0].ai = True
+    swapped = False
+    with rm['lock']:
+        connections = dict(rm['connections'])
+        connections.pop(request.sid)
+        rm['connections'] = connections
+        sid_rooms.pop(request.sid)
+        player = sid_players.pop(request.sid, None)
+        rm['closed'] = not connections
+
+        # If the room is still open and the game is on, replace the player
+        # with an AI (unless they were spectating or dead), waking up any ask
+        # they were holding up
+        in_game = player and player.state != C.PlayerState.Dead
+        if connections and gc and not gc.game_over and in_game:
+            player.ai = True
+            rm['reconnections'][player.user_id] = 'cookie'
+            for ask in list(gc.pending_asks.values()):
+                if ask['sid'] == request.sid:
+                    ask['event'].set()
+            swapped = True
+    if not rm['closed'] and rm['host']:
+        publish_room(room_id, rm)
+
+    # Close room if it is now empty. The game plays out headless, and its
+    # sender stops (nothing is queued for it after that)
+    if rm['closed']:
+        if gc:
+            for p in gc.players:
+                p.ai = True
+            gc.headless = True
             gc.tell_h = lambda x, y, *z: 0
             gc.show_h = lambda x, *y: 0
             gc.update_h = lambda: 0
+            for ask in list(gc.pending_asks.values()):
+                ask['event'].set()
+        with rm['lock']:
+            outbox, rm['outbox'] = rm['outbox'], None
+        if outbox:
+            outbox.put(None)
         socketio.close_room(room_id)
-        rooms.pop(room_id)
-        R.connection_lock.release()
-
-    elif gc and not gc.game_over:
-
-        # If disconnected person was spectating, or dead, or if the game is
-        # over, don't swap them for an AI
-        player_in_game = [p for p in gc.players if p.socket_id == request.sid]
-        if not player_in_game or player_in_game[0].state == C.PlayerState.Dead:
-            R.connection_lock.release()
-            return
+        with R.connection_lock:
+            if rooms.get(room_id) is rm:
+                rooms.pop(room_id)
+                if rm['host']:
+                    registry.delete(room_id)
 
-        # Swap player for AI
-        player_in_game[0].ai = True
-        rooms[room_id]['reconnections'][player_in_game[0].user_id] = 'cookie'
-        R.connection_lock.release()
+    elif swapped:
         socket_tell('A computer player has taken their place!',
                     [], gc, room_id)
 
-    else:
-
-        # Always release lock!
-        R.connection_lock.release()
-
 
 if __name__ == '__main__':
     socketio.run(app, debug=True, host="0.0.0.0", port=5000)
@@ -1,19 +1,18 @@
 # area.py
-# Implements a Area.
+# Implements a Area. Areas are shared by every game in a process, so the
+# zone a game places an area in is kept in the game's GameState.
 
 
 class Area:
+    __slots__ = ('name', 'desc', 'domain', 'action', 'resource_id')
+
     def __init__(self, name, desc, domain, action, resource_id):
         self.name = name
         self.desc = desc
-        self.zone = None
         self.domain = domain
         self.action = action
         self.resource_id = resource_id
 
-    def getAdjacent(self):
-        return [a for a in self.zone.areas if a != self][0]
-
     def dump(self):
         return {
             'name': self.name,
@@ -51,16 +50,16 @@ def weird_woods_action(gc, player):
     data = {'options': ["Heal 1 damage", "Give 2 damage"]}
     amount = player.gc.ask_h('select', data, player.user_id)['value']
     if amount == "Heal 1 damage":
-        gc.tell_h("The power of the {} healed {}!", [
-                  "Weird Woods", target_Player.user_id])
+        gc.tell("The power of the {} healed {}!", [
+                "Weird Woods", target_Player.user_id])
         target_Player.moveDamage(1, player)
     else:
         if target_Player.hasEquipment("Fortune Brooch"):
-            gc.tell_h("{}'s {} protected them from damage!", [
-                      target_Player.user_id, "Fortune Brooch"])
+            gc.tell("{}'s {} protected them from damage!", [
+                    target_Player.user_id, "Fortune Brooch"])
         else:
-            gc.tell_h("The power of the {} damaged {}!", [
-                      "Weird Woods", target_Player.user_id])
+            gc.tell("The power of the {} damaged {}!", [
+                    "Weird Woods", target_Player.user_id])
             target_Player.moveDamage(-2, player)
 
 
@@ -72,4 +71,4 @@ def erstwhile_altar_action(gc, player):
         equip_Equipment = player.chooseEquipment(target_Player)
         target_Player.giveEquipment(player, equip_Equipment)
     else:
-        gc.tell_h("Nobody has any items for {} to steal.", [player.user_id])
+        gc.tell("Nobody has any items for {} to steal.", [player.user_id])
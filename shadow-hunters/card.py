@@ -7,14 +7,22 @@ class Card:
     A Card of any type.
     """
 
-    def __init__(self, title, desc, color, holder, is_equip, use):
+    __slots__ = ('title', 'desc', 'color', 'is_equipment', 'use',
+                 'attack_bonus', 'defense')
+
+    def __init__(self, title, desc, color, is_equip, use,
+                 attack_bonus=0, defense=0):
         self.title = title
         self.desc = desc
         self.color = color
-        self.holder = holder
         self.is_equipment = is_equip
         self.use = use
 
+        # Equipment effects on combat: damage added to successful attacks,
+        # and damage taken off attacks received
+        self.attack_bonus = attack_bonus
+        self.defense = defense
+
     def dump(self):
         return {
             'title': self.title,
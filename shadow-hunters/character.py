@@ -3,6 +3,9 @@
 
 
 class Character:
+    __slots__ = ('name', 'alleg', 'max_damage', 'win_cond', 'win_cond_desc',
+                 'special', 'special_desc', 'resource_id', 'modifiers')
+
     def __init__(self, name, alleg, max_damage, win_cond, win_cond_desc,
                  resource_id, special, special_desc,
                  modifiers={'min_players': 4, 'max_players': 8}):
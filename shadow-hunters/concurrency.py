@@ -1,9 +1,8 @@
 from threading import Lock
 
 # concurrency.py
+# (Each room and each game context has its own lock; reveals are guarded by
+# GameContext.reveal_lock)
 
-# Lock for manipulating reveals (globally accessible)
-reveal_lock = Lock()
-
-# Lock for manipulating the rooms data structure
+# Lock for adding rooms to and removing rooms from the rooms data structure
 connection_lock = Lock()
@@ -1,43 +1,99 @@
 import random
 import copy
+from array import array
+from functools import lru_cache
+from types import MappingProxyType
 
 from card import Card
+from game_state import GameState
 # deck.py
 # Implements the Deck object.
 
 
+@lru_cache(maxsize=16)
+def catalog_index(catalog):
+    """Return the index of every card in a catalog (a tuple of cards). Decks
+    over the same catalog share it, so making a deck doesn't rebuild it."""
+
+    # Make sure every card in the catalog is a Card object
+    for c in catalog:
+        if not isinstance(c, Card):
+            raise ValueError("One or more cards is not a Card object.")
+
+    return MappingProxyType({c: i for i, c in enumerate(catalog)})
+
+
 class Deck:
     def __init__(self, cards):
-        # Make sure a list is passed to cards
-        if not isinstance(cards, list):
+        # Make sure a list (or a tuple, which is used as is) is passed to cards
+        if not isinstance(cards, (list, tuple)):
             raise ValueError("cards must be a list.")
 
-        self.cards = cards  # note that cards are ordered [bottom, ... top]
+        # The deck itself is a pile of indexes into its card catalog, held in
+        # a GameState (its own until a game context adopts the deck)
+        self.catalog = tuple(cards)
+        self._index = catalog_index(self.catalog)
+        self._gs = GameState()
+        self._pile = self._gs.add_deck(
+            array('b', range(len(cards))), array('b'))
+        self.rng = random
+        self.shuffle()
 
-        # Make sure every card in self.cards is a Card object
-        for c in self.cards:
-            if not isinstance(c, Card):
-                raise ValueError("One or more cards is not a Card object.")
+    def bind(self, gs, rng=random):
+        """Move this deck's piles into the given GameState, and shuffle with
+        the given generator from now on. The draw pile is shuffled again from
+        catalog order, so its order only depends on the generator."""
 
-        self.discard = []
+        order = array('b', sorted(self.order))
+        self._pile = gs.add_deck(order, self.discarded)
+        self._gs = gs
+        self.rng = rng
         self.shuffle()
 
+    def fork(self, gs, rng):
+        """Return a view of this deck's piles in a copy of its GameState"""
+
+        other = copy.copy(self)
+        other._gs = gs
+        other.rng = rng
+        return other
+
+    @property
+    def order(self):
+        return self._gs.draw_piles[self._pile]
+
+    @property
+    def discarded(self):
+        return self._gs.discard_piles[self._pile]
+
+    @property
+    def cards(self):
+        return [self.catalog[i] for i in self.order]  # [bottom, ... top]
+
+    @property
+    def discard(self):
+        return [self.catalog[i] for i in self.discarded]
+
     def shuffle(self):
-        random.shuffle(self.cards)
+        self.rng.shuffle(self.order)
 
     def drawCard(self):
-        if len(self.cards) > 0:
-            drawn = self.cards.pop()
-
-            # Discard the card IFF it is not an equipment card
-            if not drawn.is_equipment:
-                self.discard.append(copy.deepcopy(drawn))
+        gs, k = self._gs, self._pile
 
-            return drawn
-        else:
-            self.cards, self.discard = self.discard, []
+        # Shuffle the discard pile into a new draw pile once it runs out
+        if not gs.draw_piles[k]:
+            gs.draw_piles[k] = gs.discard_piles[k]
+            gs.discard_piles[k] = array('b')
             self.shuffle()
-            return self.drawCard()
+
+        i = gs.draw_piles[k].pop()
+        drawn = self.catalog[i]
+
+        # Discard the card IFF it is not an equipment card
+        if not drawn.is_equipment:
+            gs.discard_piles[k].append(i)
+
+        return drawn
 
     def addToDiscard(self, card):
-        self.discard.append(card)
+        self.discarded.append(self._index[card])
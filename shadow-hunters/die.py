@@ -3,9 +3,14 @@ import random
 # Die.py
 # Implements a Die object with a specified number of sides.
 
+# Number of rolls a die draws from its generator at a time
+BLOCK_SIZE = 256
+
 
 class Die:
-    def __init__(self, n_sides):
+    __slots__ = ('n_sides', 'state', 'rng', 'faces', 'block')
+
+    def __init__(self, n_sides, rng=random):
 
         # Make sure die has a positive number of sides
         if not n_sides > 0:
@@ -13,7 +18,25 @@ class Die:
 
         self.n_sides = n_sides
         self.state = None
+        self.rng = rng
+
+        # Rolls are drawn from a block of pre-generated results, which is
+        # refilled in bulk when it runs out (rolls stay reproducible from the
+        # generator's seed)
+        self.faces = range(1, n_sides + 1)
+        self.block = []
+
+    def fork(self, rng):
+        """Return a copy of this die (with the same pending rolls) that
+        refills from the given generator"""
+
+        other = Die(self.n_sides, rng)
+        other.state = self.state
+        other.block = list(self.block)
+        return other
 
     def roll(self):
-        self.state = random.randint(1, self.n_sides)
+        if not self.block:
+            self.block = self.rng.choices(self.faces, k=BLOCK_SIZE)
+        self.state = self.block.pop()
         return self.state
@@ -11,12 +11,14 @@ from constants import Alleg, CardType
 
 # elements.py
 # Encodes all characters, win conditions, special abilities,
-# game areas, decks, and cards in an element factory. Every
-# game context is initialized with its own element factory.
+# game areas, decks, and cards in a catalog, built once per process.
+# Every game context is initialized with its own element factory,
+# which makes the game's decks and areas over the shared catalog.
 
 
-class ElementFactory:
-    """Make all elements needed for the game."""
+class Catalog:
+    """All elements of the game. They are never modified once built, so
+    every game in a process (and every worker forked from it) shares them."""
 
     def __init__(self):
         # Initialize white cards
@@ -26,7 +28,6 @@ class ElementFactory:
                 desc=("When you move, you may roll twice "
                       "and choose which result to use."),
                 color=CardType.White,
-                holder=None,
                 is_equip=True,
                 use=None
             ),
@@ -35,7 +36,6 @@ class ElementFactory:
                 desc=("You receive no damage from Black cards"
                       " 'Bloodthirsty Spider', 'Vampire Bat', or 'Dynamite'."),
                 color=CardType.White,
-                holder=None,
                 is_equip=True,
                 use=None
             ),
@@ -45,7 +45,6 @@ class ElementFactory:
                     "You receive no damage from the area card"
                     " 'Weird Woods'. You can still be healed by it."),
                 color=CardType.White,
-                holder=None,
                 is_equip=True,
                 use=None
             ),
@@ -54,7 +53,6 @@ class ElementFactory:
                 desc=("If you kill another character, "
                       "you take all of their equipment cards."),
                 color=CardType.White,
-                holder=None,
                 is_equip=True,
                 use=None
             ),
@@ -65,7 +63,6 @@ class ElementFactory:
                       " your attack is successful, you give 2 points of extra"
                       " damage."),
                 color=CardType.White,
-                holder=None,
                 is_equip=True,
                 use=None
             ),
@@ -75,7 +72,6 @@ class ElementFactory:
                       "If you do, or if you are already revealed,"
                       " you heal fully."),
                 color=CardType.White,
-                holder=None,
                 is_equip=False,
                 use=single_use.advent
             ),
@@ -84,7 +80,6 @@ class ElementFactory:
                 desc=("If you are a Shadow, except for Unknown, "
                       "you must reveal your identity."),
                 color=CardType.White,
-                holder=None,
                 is_equip=False,
                 use=single_use.disenchant_mirror
             ),
@@ -94,7 +89,6 @@ class ElementFactory:
                       " 6-sided die. That character heals an amount of damage"
                       " equal to the die roll."),
                 color=CardType.White,
-                holder=None,
                 is_equip=False,
                 use=single_use.blessing
             ),
@@ -105,7 +99,6 @@ class ElementFactory:
                       "If you do, or if you are already revealed, "
                       "you heal fully."),
                 color=CardType.White,
-                holder=None,
                 is_equip=False,
                 use=single_use.chocolate
             ),
@@ -113,7 +106,6 @@ class ElementFactory:
                 title="Concealed Knowledge",
                 desc="When this turn is over, it will be your turn again.",
                 color=CardType.White,
-                holder=None,
                 is_equip=False,
                 use=single_use.concealed_knowledge
             ),
@@ -122,7 +114,6 @@ class ElementFactory:
                 desc=("You take no damage from the direct attacks of "
                       "other characters until the start of your next turn."),
                 color=CardType.White,
-                holder=None,
                 is_equip=False,
                 use=single_use.guardian_angel
             ),
@@ -132,17 +123,16 @@ class ElementFactory:
                       " damage you receive from attacks is reduced by"
                       " 1 point."),
                 color=CardType.White,
-                holder=None,
                 is_equip=True,
-                use=lambda is_attack, successful, amt: max(
-                    0, amt - 1)  # applies to both attack and defend
+                use=None,
+                attack_bonus=-1,
+                defense=1
             ),
             card.Card(
                 title="Flare of Judgement",
                 desc=("All characters except yourself"
                       " receive 2 points of damage."),
                 color=CardType.White,
-                holder=None,
                 is_equip=False,
                 use=single_use.judgement
             ),
@@ -151,7 +141,6 @@ class ElementFactory:
                 desc=("Place a character's damage marker to 7"
                       " (You can choose yourself)."),
                 color=CardType.White,
-                holder=None,
                 is_equip=False,
                 use=single_use.first_aid
             ),
@@ -159,7 +148,6 @@ class ElementFactory:
                 title="Holy Water of Healing",
                 desc="Heal 2 points of your damage.",
                 color=CardType.White,
-                holder=None,
                 is_equip=False,
                 use=single_use.holy_water
             ),
@@ -167,7 +155,6 @@ class ElementFactory:
                 title="Holy Water of Healing",
                 desc="Heal 2 points of your damage.",
                 color=CardType.White,
-                holder=None,
                 is_equip=False,
                 use=single_use.holy_water
             )
@@ -181,7 +168,6 @@ class ElementFactory:
                     "You must attack another character on your turn."
                     " This attack uses the 4-sided die."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=True,
                 use=None
             ),
@@ -191,7 +177,6 @@ class ElementFactory:
                     "Your attack will affect all characters in your"
                     " attack range (the dice are rolled only once)."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=True,
                 use=None
             ),
@@ -199,7 +184,6 @@ class ElementFactory:
                 title="Handgun",
                 desc="All ranges but yours become your attack range.",
                 color=CardType.Black,
-                holder=None,
                 is_equip=True,
                 use=None
             ),
@@ -208,36 +192,32 @@ class ElementFactory:
                 desc=("If your attack is successful, "
                       "you give 1 point of extra damage."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=True,
-                use=lambda is_attack, successful, amt: amt +
-                                                       1 if (is_attack and successful) else amt
+                use=None,
+                attack_bonus=1
             ),
             card.Card(
                 title="Chainsaw",
                 desc=("If your attack is successful, "
                       "you give 1 point of extra damage."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=True,
-                use=lambda is_attack, successful, amt: amt +
-                                                       1 if (is_attack and successful) else amt
+                use=None,
+                attack_bonus=1
             ),
             card.Card(
                 title="Rusted Broad Axe",
                 desc=("If your attack is successful, "
                       "you give 1 point of extra damage."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=True,
-                use=lambda is_attack, successful, amt: amt +
-                                                       1 if (is_attack and successful) else amt
+                use=None,
+                attack_bonus=1
             ),
             card.Card(
                 title="Moody Goblin",
                 desc="You steal an equipment card from any character.",
                 color=CardType.Black,
-                holder=None,
                 is_equip=False,
                 use=single_use.moody_goblin
             ),
@@ -245,7 +225,6 @@ class ElementFactory:
                 title="Moody Goblin",
                 desc="You steal an equipment card from any character.",
                 color=CardType.Black,
-                holder=None,
                 is_equip=False,
                 use=single_use.moody_goblin
             ),
@@ -254,7 +233,6 @@ class ElementFactory:
                 desc=("You give 2 points of damage to any character"
                       " and receive 2 points of damage yourself."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=False,
                 use=single_use.bloodthirsty_spider
             ),
@@ -263,7 +241,6 @@ class ElementFactory:
                 desc=("You give 2 points of damage to any character"
                       " and heal 1 point of your own damage."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=False,
                 use=single_use.vampire_bat
             ),
@@ -272,7 +249,6 @@ class ElementFactory:
                 desc=("You give 2 points of damage to any character"
                       " and heal 1 point of your own damage."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=False,
                 use=single_use.vampire_bat
             ),
@@ -281,7 +257,6 @@ class ElementFactory:
                 desc=("You give 2 points of damage to any character"
                       " and heal 1 point of your own damage."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=False,
                 use=single_use.vampire_bat
             ),
@@ -290,7 +265,6 @@ class ElementFactory:
                 desc=("If you are a Shadow, you may reveal your identity."
                       " If you do, you fully heal you damage."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=False,
                 use=single_use.diabolic_ritual
             ),
@@ -300,7 +274,6 @@ class ElementFactory:
                       "If you have no equipment cards,"
                       " you receive 1 point of damage."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=False,
                 use=single_use.banana_peel
             ),
@@ -311,7 +284,6 @@ class ElementFactory:
                       "by the total number rolled "
                       "(nothing happens if a 7 is rolled)."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=False,
                 use=single_use.dynamite
             ),
@@ -323,7 +295,6 @@ class ElementFactory:
                       "If the die number is 5 or 6, "
                       "you get 3 points of damage."),
                 color=CardType.Black,
-                holder=None,
                 is_equip=False,
                 use=single_use.spiritual_doll
             )
@@ -337,7 +308,6 @@ class ElementFactory:
                       "If so, you must either give an Equipment card"
                       " to the current player or receive 1 damage!"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.blackmail
             ),
@@ -347,7 +317,6 @@ class ElementFactory:
                       "If so, you must either give an Equipment card"
                       " to the current player or receive 1 damage!"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.blackmail
             ),
@@ -357,7 +326,6 @@ class ElementFactory:
                       "If so, you must either give an Equipment card"
                       " to the current player or receive 1 damage!"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.greed
             ),
@@ -367,7 +335,6 @@ class ElementFactory:
                       "If so, you must either give an Equipment card"
                       " to the current player or receive 1 damage!"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.greed
             ),
@@ -377,7 +344,6 @@ class ElementFactory:
                       "If so, you must either give an Equipment card"
                       " to the current player or receive 1 damage!"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.anger
             ),
@@ -387,7 +353,6 @@ class ElementFactory:
                       "If so, you must either give an Equipment card"
                       " to the current player or receive 1 damage!"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.anger
             ),
@@ -395,7 +360,6 @@ class ElementFactory:
                 title="Hermit\'s Slap",
                 desc="I bet you're a Hunter. If so, you receive 1 damage!",
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.slap
             ),
@@ -403,7 +367,6 @@ class ElementFactory:
                 title="Hermit\'s Slap",
                 desc="I bet you're a Hunter. If so, you receive 1 damage!",
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.slap
             ),
@@ -411,7 +374,6 @@ class ElementFactory:
                 title="Hermit\'s Spell",
                 desc="I bet you're a Shadow. If so, you receive 1 damage!",
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.spell
             ),
@@ -419,7 +381,6 @@ class ElementFactory:
                 title="Hermit\'s Exorcism",
                 desc="I bet you're a Shadow. If so, you receive 2 damage!",
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.exorcism
             ),
@@ -429,7 +390,6 @@ class ElementFactory:
                       "(However, if you have no damage, "
                       "then you receive 1 damage!)"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.nurturance
             ),
@@ -439,7 +399,6 @@ class ElementFactory:
                       "(However, if you have no damage, "
                       "then you receive 1 damage!)"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.aid
             ),
@@ -449,7 +408,6 @@ class ElementFactory:
                       "(However, if you have no damage, "
                       "then you receive 1 damage!)"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.huddle
             ),
@@ -458,7 +416,6 @@ class ElementFactory:
                 desc=("I bet your maximum HP is 12 or more. "
                       "If so, you receive 2 damage!"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.lesson
             ),
@@ -467,7 +424,6 @@ class ElementFactory:
                 desc=("I bet your maximum HP is 11 or less. "
                       "If so, you receive 1 damage!"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.bully
             ),
@@ -476,20 +432,19 @@ class ElementFactory:
                 desc=("You must reveal your character information "
                       "secretly to the current player!"),
                 color=CardType.Hermit,
-                holder=None,
                 is_equip=False,
                 use=hermit.prediction
             )
         ]
 
-        # Initialize white, black, hermit decks
-        self.WHITE_DECK = deck.Deck(cards=white_cards)
-        self.BLACK_DECK = deck.Deck(cards=black_cards)
-        self.HERMIT_DECK = deck.Deck(cards=hermit_cards)
+        # Initialize white, black, hermit cards
+        self.WHITE_CARDS = tuple(white_cards)
+        self.BLACK_CARDS = tuple(black_cards)
+        self.HERMIT_CARDS = tuple(hermit_cards)
 
         # Initialize characters
 
-        self.CHARACTERS = [
+        self.CHARACTERS = (
             character.Character(
                 name="Valkyrie",
                 alleg=Alleg.Shadow,
@@ -630,10 +585,10 @@ class ElementFactory:
                               " void their special ability."),
                 resource_id="ellen"
             )
-        ]
+        )
 
         # Initialize areas
-        self.AREAS = [
+        self.AREAS = (
             area.Area(
                 name="Hermit's Cabin",
                 desc="Draw a Hermit Card.",
@@ -676,4 +631,19 @@ class ElementFactory:
                 action=area.erstwhile_altar_action,
                 resource_id="erstwhile-altar"
             )
-        ]
+        )
+
+
+CATALOG = Catalog()
+
+
+class ElementFactory:
+    """Make the elements of a single game over the shared catalog: its own
+    decks, and lists of the characters and areas to deal out."""
+
+    def __init__(self, catalog=CATALOG):
+        self.WHITE_DECK = deck.Deck(cards=catalog.WHITE_CARDS)
+        self.BLACK_DECK = deck.Deck(cards=catalog.BLACK_CARDS)
+        self.HERMIT_DECK = deck.Deck(cards=catalog.HERMIT_CARDS)
+        self.CHARACTERS = list(catalog.CHARACTERS)
+        self.AREAS = list(catalog.AREAS)
@@ -1,19 +1,26 @@
 from die import Die
 from zone import Zone
+from game_state import GameState
 
 from utils import make_hash_sha256
 import constants as C
+from collections import namedtuple
+from greenlet import greenlet, getcurrent
+from threading import Lock
 import random
 import copy
 
 # game_context.py
 # Implements a GameContext.
 
+# A decision the game is waiting on, yielded by GameContext.play_steps()
+Decision = namedtuple('Decision', ['form', 'data', 'user_id'])
+
 
 class GameContext:
     def __init__(self, players, characters, black_cards, white_cards,
                  hermit_cards, areas, ask_h, tell_h, show_h, update_h,
-                 modifiers=dict()):
+                 modifiers=dict(), headless=False, seed=None):
 
         # Instantiate gameplay objects
         self.players = players
@@ -37,6 +44,9 @@ class GameContext:
             inv = dict(enumerate(d)).items()
             p.delexicalizations = {v.user_id: k for k, v in inv}
 
+        # Map each player to the color of their name in messages
+        self.player_colors = {p.user_id: p.color for p in self.players}
+
         # Instantiate characters
         self.characters = characters
         if len(self.players) <= 6:
@@ -52,35 +62,64 @@ class GameContext:
         self.white_cards = white_cards
         self.hermit_cards = hermit_cards
 
-        # Instantiate status
+        # Instantiate random number generators. The game owns a seeded
+        # generator split into independent streams for dice, decks, setup and
+        # agents, so the game can be replayed exactly from its seed and e.g.
+        # a different agent doesn't change the dice.
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self._seedStreams(random.Random(seed))
+
+        # Instantiate the compact game state that players and decks share
+        self.game_state = GameState(len(self.players))
+        for i, p in enumerate(self.players):
+            p.bind(self.game_state, i)
+        for d in [self.white_cards, self.black_cards, self.hermit_cards]:
+            d.bind(self.game_state, self.deck_rng)
+
+        # Instantiate dump caches (see dump())
+        self._dumped = None
+        self._static_dump = None
+
+        # Instantiate status, and the lock that guards reveals (which can
+        # come from the game loop or from a player at any time)
         self.game_over = False
+        self.reveal_lock = Lock()
 
-        # Instantiate message handlers
+        # Instantiate message handlers. A headless game has nobody listening,
+        # so it never builds messages, display payloads or state updates
+        # (only ask_h is still consulted for decisions).
+        self.headless = headless
         self.ask_h = ask_h
         self.tell_h = tell_h
         self.show_h = show_h
         self.update_h = update_h
+        if headless:
+            self.tell_h = lambda x, y, *z: 0
+            self.show_h = lambda x, *y: 0
+            self.update_h = lambda: 0
 
-        # Instantiate answer bin
-        self.answer_bin = {
-            'answered': False,
-            'sid': '',
-            'data': {}
-        }
+        # Instantiate outstanding asks, indexed by ask id
+        self.pending_asks = {}
 
         # Assign modifiers
         self.modifiers = modifiers
 
-        # Instantiate dice
-        self.die4 = Die(4)
-        self.die6 = Die(6)
-
         # Randomly shuffle areas across zones
-        random.shuffle(areas)
+        self.setup_rng.shuffle(areas)
         self.zones = [Zone([areas.pop(), areas.pop()]) for i in range(3)]
+        for z in self.zones:
+            self.game_state.zone_index(z)
+
+        # Index the areas by name and by the rolls that lead to them
+        self.area_by_name = {}
+        self.area_by_roll = {}
         for z in self.zones:
             for a in z.areas:
-                a.zone = z
+                self.area_by_name[a.name] = a
+                for roll in a.domain:
+                    self.area_by_roll[roll] = a
 
         # Figure out how many of each allegiance there has to be
         counts_dict = {
@@ -92,8 +131,8 @@ class GameContext:
         }
 
         # Randomly assign characters and point game context
-        character_q = copy.deepcopy(self.characters)
-        random.shuffle(character_q)
+        character_q = list(self.characters)
+        self.setup_rng.shuffle(character_q)
         queue = []
         while character_q:
             ch = character_q.pop()
@@ -107,35 +146,40 @@ class GameContext:
             player.setCharacter(queue.pop())
             player.gc = self
 
+    def _seedStreams(self, master):
+        self.dice_rng, self.deck_rng, self.setup_rng, self.agent_rng = [
+            random.Random(master.getrandbits(64)) for _ in range(4)]
+
+        # Instantiate dice
+        self.die4 = Die(4, self.dice_rng)
+        self.die6 = Die(6, self.dice_rng)
+
     def getLivePlayers(self, filter_fn=(lambda x: True)):
-        live = [p for p in self.players if p.state != C.PlayerState.Dead]
+        live = [self.players[i] for i in self.game_state.live()]
         return list(filter(filter_fn, live))
 
     def getDeadPlayers(self, filter_fn=(lambda x: True)):
-        dead = [p for p in self.players if p.state == C.PlayerState.Dead]
+        dead = [self.players[i] for i in self.game_state.dead()]
         return list(filter(filter_fn, dead))
 
     def getPlayersAt(self, location_name):
-        live = self.getLivePlayers()
-        live_loc = [p for p in live if p.location]
-        return [p for p in live_loc if p.location.name == location_name]
+        area = self.area_by_name.get(location_name)
+        if area is None:
+            return []
+        gs = self.game_state
+        return [self.players[i] for i in gs.at_area(gs.area_index(area))]
 
     def getAreas(self):
-        areas = []
-        for z in self.zones:
-            for a in z.areas:
-                areas.append(a.name)
-
-        return areas
+        return list(self.area_by_name)
 
     def getAreaFromRoll(self, roll_result):
-        destination_Area = None
-        for z in self.zones:
-            for a in z.areas:
-                if roll_result in a.domain:
-                    destination_Area = a
+        return self.area_by_roll.get(roll_result)
 
-        return destination_Area
+    def tell(self, fmt, *args):
+        # Headless games have nobody to tell, so skip building the message
+        if self.headless:
+            return
+        self.tell_h(fmt, *args)
 
     def _checkWinConditions(self):
         return [p for p in self.players if p.character.win_cond(self, p)]
@@ -145,7 +189,7 @@ class GameContext:
         if len(winners):
             self.game_over = True
             winners = self._checkWinConditions()  # Hack to collect Allie
-            if tell:
+            if tell and not self.headless:
                 display_data = {'type': 'win', 'winners': [
                     p.dump() for p in winners]}
                 self.show_h(display_data)
@@ -160,7 +204,7 @@ class GameContext:
 
     def play(self, debug=False):
         game_hash = ""
-        turn = random.randint(0, len(self.turn_order) - 1)
+        turn = self.setup_rng.randint(0, len(self.turn_order) - 1)
         while True:
             # Hash each successive game state
             # (effectively Reduce(states, lambda a, b: hash(a + b)))
@@ -182,25 +226,125 @@ class GameContext:
 
         if debug:
             return game_hash
+        return winners
+
+    def play_steps(self, debug=False):
+        """Play the game as a generator that yields a Decision whenever a
+        player has to make one, and resumes with the answer sent back (the
+        dict that ask_h would have returned). The generator returns what
+        play() returns.
+
+        The game runs in its own greenlet, which is switched out at each
+        decision, so a paused game holds no thread and one driver can step
+        any number of games:
+
+            steps = gc.play_steps()
+            decision = next(steps)
+            while True:
+                decision = steps.send({'value': ...})  # until StopIteration
+        """
+
+        def ask(form, data, user_id):
+            return engine.parent.switch(Decision(form, data, user_id))
+
+        engine = greenlet(lambda: self.play(debug))
+        ask_h, self.ask_h = self.ask_h, ask
+        try:
+            engine.parent = getcurrent()
+            step = engine.switch()
+            while isinstance(step, Decision):
+                answer = yield step
+                engine.parent = getcurrent()
+                step = engine.switch(answer)
+            return step
+        finally:
+            self.ask_h = ask_h
+            if not engine.dead:
+                engine.parent = getcurrent()
+                engine.throw()
+
+    def fork(self, ask_h=None, tell_h=None, show_h=None, update_h=None,
+             rng=None):
+        """Return a detached copy of this game, e.g. to try out actions in a
+        look-ahead search.
+
+        The fork shares the immutable card, character and area definitions
+        with this game and copies only its mutable state: the GameState (a few
+        array slices) plus thin player and deck views onto the copy. Nothing
+        done to the fork affects this game. Unless handlers are given, the
+        fork is headless and every ask is answered by the asked player's
+        agent.
+
+        Without `rng`, the fork continues copies of this game's random
+        streams (so it sees the same dice and draws this game would), which
+        makes forks of one position common-random-number comparisons.
+        Otherwise its streams are seeded from the given generator."""
+
+        other = copy.copy(self)
+        other.game_state = self.game_state.copy()
+        other.modifiers = dict(self.modifiers)
+        if rng is None:
+            other.dice_rng = copy.copy(self.dice_rng)
+            other.deck_rng = copy.copy(self.deck_rng)
+            other.setup_rng = copy.copy(self.setup_rng)
+            other.agent_rng = copy.copy(self.agent_rng)
+            other.die4 = self.die4.fork(other.dice_rng)
+            other.die6 = self.die6.fork(other.dice_rng)
+        else:
+            other._seedStreams(rng)
+
+        # Point players and decks at the copied state
+        forked = {p: p.fork(other) for p in self.players}
+        other.players = [forked[p] for p in self.players]
+        other.turn_order = [forked[p] for p in self.turn_order]
+        other.white_cards = self.white_cards.fork(
+            other.game_state, other.deck_rng)
+        other.black_cards = self.black_cards.fork(
+            other.game_state, other.deck_rng)
+        other.hermit_cards = self.hermit_cards.fork(
+            other.game_state, other.deck_rng)
+        other.pending_asks = {}
+        other.reveal_lock = Lock()
+
+        # Plug in handlers
+        def agent_ask(form, data, user_id):
+            p = [p for p in other.players if p.user_id == user_id][0]
+            return p.agent.choose_action(data['options'], player=p, gc=other)
+
+        other.headless = not (tell_h or show_h or update_h)
+        other.ask_h = ask_h or agent_ask
+        other.tell_h = tell_h or (lambda x, y, *z: 0)
+        other.show_h = show_h or (lambda x, *y: 0)
+        other.update_h = update_h or (lambda: 0)
+        return other
 
     def dump(self):
+        """Return the public and private states of the game.
+
+        Dumps are cached: players rebuild their dumps only after a change
+        (see Player.dump()), zones and characters never change, and the whole
+        dump is reused while no player has changed. So successive dumps share
+        their unchanged parts, and must not be modified."""
+
         # Note that public_players and private_state are no longer keyed by
         # socket_ids
-        public_zones = [z.dump() for z in self.zones]
         private_players = [p.dump() for p in self.players]
-        public_players = copy.deepcopy(private_players)
-
-        # Hide character information if player hasn't revealed themselves
-        for p in public_players:
-            if p['state'] == 2:
-                p['character'] = {}
+        cached = self._dumped
+        if cached and all(a is b for a, b in zip(private_players, cached[1])):
+            return cached
 
         # Collect the public states
+        if not self._static_dump:
+            self._static_dump = (
+                [z.dump() for z in self.zones],
+                [c.dump() for c in self.characters]
+            )
         public_state = {
-            'zones': public_zones,
-            'players': public_players,
-            'characters': [c.dump() for c in self.characters]
+            'zones': self._static_dump[0],
+            'players': [p.dumpPublic() for p in self.players],
+            'characters': self._static_dump[1]
         }
         private_state = private_players
 
-        return public_state, private_state
+        self._dumped = (public_state, private_state)
+        return self._dumped
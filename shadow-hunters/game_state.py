@@ -0,0 +1,191 @@
+from array import array
+
+import constants as C
+
+# game_state.py
+# Implements a GameState, the compact store behind every player and deck.
+#
+# The mutable state of a game is kept column-wise in flat arrays (one entry
+# per player, or one index array per deck pile) instead of being spread over
+# Player and Deck objects. Players and decks are views that read and write
+# their row of the GameState, so a whole game copies with a handful of array
+# slices and can be queried without walking the object graph.
+
+DEAD = C.PlayerState.Dead.value
+HIDDEN = C.PlayerState.Hidden.value
+NOWHERE = -1
+
+
+class GameState:
+    def __init__(self, n_players=0):
+
+        # Per-player columns
+        self.damage = array('b', [0] * n_players)
+        self.state = array('b', [HIDDEN] * n_players)
+        self.alleg = array('b', [NOWHERE] * n_players)
+        self.location = array('b', [NOWHERE] * n_players)
+        self.zone = array('b', [NOWHERE] * n_players)
+        self.equipment = array('L', [0] * n_players)
+
+        # Live and dead players per allegiance, and player rows in the order
+        # they died, kept up to date by set_state() and set_alleg()
+        self.live_count = array('b', [0] * len(C.Alleg))
+        self.dead_count = array('b', [0] * len(C.Alleg))
+        self.death_order = []
+
+        # Player rows in each area and zone (by index), kept up to date by
+        # set_location()
+        self.area_players = {}
+        self.zone_players = {}
+
+        # Per-deck piles of card indexes, ordered [bottom, ... top]
+        self.draw_piles = []
+        self.discard_piles = []
+
+        # Lookup tables for the indexes stored above, and the zone each area
+        # was placed in. They are append-only, so copies of a GameState share
+        # them.
+        self.areas = []
+        self.zones = []
+        self.area_zones = array('b')
+        self.equip_bits = {}
+        self._area_ids = {}
+        self._zone_ids = {}
+
+    def copy(self):
+        other = GameState.__new__(GameState)
+        other.damage = self.damage[:]
+        other.state = self.state[:]
+        other.alleg = self.alleg[:]
+        other.location = self.location[:]
+        other.zone = self.zone[:]
+        other.equipment = self.equipment[:]
+        other.live_count = self.live_count[:]
+        other.dead_count = self.dead_count[:]
+        other.death_order = self.death_order[:]
+        other.area_players = {k: set(v) for k, v in self.area_players.items()}
+        other.zone_players = {k: set(v) for k, v in self.zone_players.items()}
+        other.draw_piles = [p[:] for p in self.draw_piles]
+        other.discard_piles = [p[:] for p in self.discard_piles]
+        other.areas = self.areas
+        other.zones = self.zones
+        other.area_zones = self.area_zones
+        other.equip_bits = self.equip_bits
+        other._area_ids = self._area_ids
+        other._zone_ids = self._zone_ids
+        return other
+
+    def set_state(self, row, state):
+        was_dead = self.state[row] == DEAD
+        self.state[row] = state
+        if was_dead == (state == DEAD):
+            return
+
+        # Someone died (or was brought back): move them between the counts
+        alleg = self.alleg[row]
+        if not was_dead:
+            self.death_order.append(row)
+            if alleg != NOWHERE:
+                self.live_count[alleg] -= 1
+                self.dead_count[alleg] += 1
+        else:
+            self.death_order.remove(row)
+            if alleg != NOWHERE:
+                self.live_count[alleg] += 1
+                self.dead_count[alleg] -= 1
+
+    def set_alleg(self, row, alleg):
+        dead = self.state[row] == DEAD
+        counts = self.dead_count if dead else self.live_count
+        if self.alleg[row] != NOWHERE:
+            counts[self.alleg[row]] -= 1
+        if alleg != NOWHERE:
+            counts[alleg] += 1
+        self.alleg[row] = alleg
+
+    def set_location(self, row, area):
+        """Move a player to an area index (NOWHERE takes them off the board),
+        along with the zone the area is in"""
+
+        zone = self.area_zones[area] if area != NOWHERE else NOWHERE
+        if self.location[row] != NOWHERE:
+            self.area_players[self.location[row]].discard(row)
+        if self.zone[row] != NOWHERE:
+            self.zone_players[self.zone[row]].discard(row)
+        if area != NOWHERE:
+            self.area_players.setdefault(area, set()).add(row)
+        if zone != NOWHERE:
+            self.zone_players.setdefault(zone, set()).add(row)
+        self.location[row] = area
+        self.zone[row] = zone
+
+    def add_deck(self, draw_pile, discard_pile):
+        self.draw_piles.append(draw_pile)
+        self.discard_piles.append(discard_pile)
+        return len(self.draw_piles) - 1
+
+    def area_index(self, area):
+        """Return the index of an area, registering it if it is new"""
+
+        if area is None:
+            return NOWHERE
+        if area not in self._area_ids:
+            self._area_ids[area] = len(self.areas)
+            self.areas.append(area)
+            self.area_zones.append(NOWHERE)
+        return self._area_ids[area]
+
+    def zone_index(self, zone):
+        """Return the index of a zone, registering it (and placing its areas
+        in it) if it is new"""
+
+        if zone is None:
+            return NOWHERE
+        if zone not in self._zone_ids:
+            z = self._zone_ids[zone] = len(self.zones)
+            self.zones.append(zone)
+            for a in zone.areas:
+                self.area_zones[self.area_index(a)] = z
+        return self._zone_ids[zone]
+
+    def zone_of(self, area):
+        """Return the zone an area was placed in, if any"""
+
+        z = self.area_zones[self.area_index(area)] if area else NOWHERE
+        return self.zones[z] if z != NOWHERE else None
+
+    def equip_bit(self, title):
+        """Return the equipment bitmask bit of a title, registering it if it
+        is new"""
+
+        if title not in self.equip_bits:
+            self.equip_bits[title] = 1 << len(self.equip_bits)
+        return self.equip_bits[title]
+
+    def equip_mask(self, equipment):
+        mask = 0
+        for eq in equipment:
+            mask |= self.equip_bit(eq.title)
+        return mask
+
+    # Queries over the player columns (all return player rows)
+
+    def live(self):
+        return [i for i, s in enumerate(self.state) if s != DEAD]
+
+    def dead(self):
+        return [i for i, s in enumerate(self.state) if s == DEAD]
+
+    def at_area(self, area):
+        return sorted(self.area_players.get(area, ()))
+
+    def in_zone(self, zone):
+        return sorted(self.zone_players.get(zone, ()))
+
+    def outside_zone(self, zone):
+        return sorted(i for z, rows in self.zone_players.items()
+                      if z != zone for i in rows)
+
+    def holding(self, title):
+        bit = self.equip_bits.get(title, 0)
+        return [i for i, m in enumerate(self.equipment) if m & bit]
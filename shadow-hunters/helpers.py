@@ -1,54 +1,83 @@
 from game_context import GameContext
-from elements import ElementFactory
+from elements import CATALOG, ElementFactory
 from player import Player
 
+from functools import lru_cache
+from types import MappingProxyType
+
 import constants as C
 import random
 
 # helper functions for frontend communication
 
 
-def color_format(str, args, gc):
+def _element_colors():
 
     # get all elements by name
-    ef = ElementFactory()
-    decks = ef.WHITE_DECK.cards + ef.BLACK_DECK.cards + ef.HERMIT_DECK.cards
-    cards = [c.title for c in decks]
-    shadows = [c.name for c in ef.CHARACTERS if c.alleg == C.Alleg.Shadow]
-    hunters = [c.name for c in ef.CHARACTERS if c.alleg == C.Alleg.Hunter]
-    neutrals = [c.name for c in ef.CHARACTERS if c.alleg == C.Alleg.Neutral]
-    areas = [a.name for a in ef.AREAS]
-
-    # assign colors
-    colors = [C.TEXT_COLORS['server']]
+    cards = CATALOG.WHITE_CARDS + CATALOG.BLACK_CARDS + CATALOG.HERMIT_CARDS
+    factions = {
+        C.Alleg.Shadow: C.TEXT_COLORS['shadow'],
+        C.Alleg.Hunter: C.TEXT_COLORS['hunter'],
+        C.Alleg.Neutral: C.TEXT_COLORS['neutral']
+    }
+
+    # assign colors, from the lowest to the highest precedence (a name that
+    # is e.g. both an area and a card is colored as a card)
+    colors = {}
+    for a in CATALOG.AREAS:
+        colors[a.name] = C.TEXT_COLORS[a.name]
+    for alleg in [C.Alleg.Neutral, C.Alleg.Hunter, C.Alleg.Shadow]:
+        colors[alleg.name] = factions[alleg]
+        for ch in CATALOG.CHARACTERS:
+            if ch.alleg == alleg:
+                colors[ch.name] = factions[alleg]
+    colors['a Hermit Card'] = C.TEXT_COLORS['Green']
+    for c in reversed(cards):
+        card_type = c.color.name
+        card_color = 'Green' if card_type == 'Hermit' else card_type
+        colors[c.title] = C.TEXT_COLORS[card_color]
+    return colors
+
+
+# text color of every element and faction name
+ELEMENT_COLORS = MappingProxyType(_element_colors())
+
+
+@lru_cache(maxsize=256)
+def parse_template(str):
+    """Split a message template into the text around its {} placeholders"""
+    return tuple(str.split('{}'))
+
+
+def arg_colors(args, gc):
+    """Return the color of each argument of a message"""
+
+    server = C.TEXT_COLORS['server']
+    player_colors = gc.player_colors if gc else {}
+    colors = []
     for n in args:
-        if gc:
-            p = [p for p in gc.players if p.user_id == n]
         if isinstance(n, int):
             colors.append(C.TEXT_COLORS['number'])
-        elif n in cards:
-            card_type = [c for c in decks if c.title == n][0].color.name
-            card_color = 'Green' if card_type == 'Hermit' else card_type
-            colors.append(C.TEXT_COLORS[card_color])
-        elif n == 'a Hermit Card':
-            colors.append(C.TEXT_COLORS['Green'])
-        elif n in shadows or n == 'Shadow':
-            colors.append(C.TEXT_COLORS['shadow'])
-        elif n in hunters or n == 'Hunter':
-            colors.append(C.TEXT_COLORS['hunter'])
-        elif n in neutrals or n == 'Neutral':
-            colors.append(C.TEXT_COLORS['neutral'])
-        elif n in areas:
-            colors.append(C.TEXT_COLORS[n])
-        elif gc and p:
-            colors.append(p[0].color)
         else:
-            colors.append(C.TEXT_COLORS['server'])
-        colors.append(C.TEXT_COLORS['server'])
+            colors.append(ELEMENT_COLORS.get(n) or
+                          player_colors.get(n, server))
+    return colors
+
 
-    # assign strings
-    args += ['']
-    strings = sum([[s, args.pop(0)] for s in str.split('{}')], [])[:-1]
+def color_format(str, args, gc):
+
+    # assign colors (args in their colors, the rest in the server's)
+    server = C.TEXT_COLORS['server']
+    colors = [server]
+    for c in arg_colors(args, gc):
+        colors += [c, server]
+
+    # assign strings (the text of the template with args in its placeholders)
+    segments = parse_template(str)
+    strings = [segments[0]]
+    for i in range(1, len(segments)):
+        strings.append(args[i - 1] if i <= len(args) else '')
+        strings.append(segments[i])
 
     # return tuple of strings and colors
     return (strings, colors)
@@ -56,23 +85,14 @@ def color_format(str, args, gc):
 # Helper functions for data retrieval
 
 
-def get_room_id(rooms, sid):
-    candidates = [r for r in rooms.keys() if sid in rooms[r]
-                  ['connections'].keys()]
-    if not candidates:
-        return None
-    else:
-        return candidates[0]
-
-
+@lru_cache(maxsize=1)
 def get_reserved_words():
-    ef = ElementFactory()
-    cards = ef.WHITE_DECK.cards + ef.BLACK_DECK.cards + ef.HERMIT_DECK.cards
+    cards = CATALOG.WHITE_CARDS + CATALOG.BLACK_CARDS + CATALOG.HERMIT_CARDS
     reserved = [c.title for c in cards]
-    reserved += [ch.name for ch in ef.CHARACTERS]
-    reserved += [a.name for a in ef.AREAS]
+    reserved += [ch.name for ch in CATALOG.CHARACTERS]
+    reserved += [a.name for a in CATALOG.AREAS]
     reserved += ["Shadow", "Hunter", "Neutral", "Decline"]
-    return reserved
+    return frozenset(reserved)
 
 
 def get_card_by_title(ef, title):
@@ -81,10 +101,7 @@ def get_card_by_title(ef, title):
 
 
 def get_area_by_name(gc, name):
-    for z in gc.zones:
-        for a in z.areas:
-            if a.name == name:
-                return a
+    return gc.area_by_name.get(name)
 
 
 def get_character_by_name(ef, name):
@@ -114,7 +131,7 @@ def answer_sequence(answers):
     return ask_function
 
 
-def fresh_gc_ef(n_players=random.randint(4, 8)):
+def fresh_gc_ef(n_players=random.randint(4, 8), seed=None):
     players = [Player("CPU_{}".format(
         i), 'unused', 'unused', True) for i in range(1, n_players + 1)]
     ef = ElementFactory()
@@ -126,10 +143,11 @@ def fresh_gc_ef(n_players=random.randint(4, 8)):
         white_cards=ef.WHITE_DECK,
         hermit_cards=ef.HERMIT_DECK,
         areas=ef.AREAS,
-        ask_h=lambda x, y, z: {'value': random.choice(y['options'])},
+        ask_h=lambda x, y, z: {'value': gc.agent_rng.choice(y['options'])},
         tell_h=lambda x, y, *z: 0,
         show_h=lambda x, *y: 0,
-        update_h=lambda: 0
+        update_h=lambda: 0,
+        seed=seed
     )
     return (gc, ef)
 
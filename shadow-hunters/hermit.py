@@ -42,15 +42,16 @@ class HermitEffect():
         target = args['self'].choosePlayer()
 
         # Present the card to the target
-        display_data = args['card'].dump()
-        display_data['type'] = 'draw'
-        args['self'].gc.show_h(display_data, target.socket_id)
+        if not args['self'].gc.headless:
+            display_data = args['card'].dump()
+            display_data['type'] = 'draw'
+            args['self'].gc.show_h(display_data, target.socket_id)
         return target
 
     def get_options(self, t):
 
         # Tell the target they are affected by the card
-        t.gc.tell_h(self.info, self.info_args(t), t.socket_id)
+        t.gc.tell(self.info, self.info_args(t), t.socket_id)
 
         # Give the amount of damage the target should take or heal as an option
         d = self.damage_to(t)
@@ -75,30 +76,31 @@ class HermitEffect():
             d = self.damage_to(t)
             verb2 = "healed" if d > 0 else "took"
             t.moveDamage(d, args['self'])
-            t.gc.tell_h("{} {} {} damage!", [t.user_id, verb2, abs(d)])
+            t.gc.tell("{} {} {} damage!", [t.user_id, verb2, abs(d)])
 
     def no_effect_on(self, t):
 
         # Prompt target to do nothing
-        t.gc.tell_h(self.info + " Do nothing.", self.info_args(t), t.socket_id)
+        t.gc.tell(self.info + " Do nothing.", self.info_args(t), t.socket_id)
         data = {'options': ['Do nothing']}
         t.gc.ask_h('confirm', data, t.user_id)
 
         # Inform other players
-        t.gc.tell_h("{} did nothing.", [t.user_id])
+        t.gc.tell("{} did nothing.", [t.user_id])
 
     def force_reveal(self, args, t):
 
         # Prompt target to reveal themself
-        t.gc.tell_h("You have no choice. Reveal yourself to {}.", [
-                         args['self'].user_id], t.socket_id)
+        t.gc.tell("You have no choice. Reveal yourself to {}.", [
+                       args['self'].user_id], t.socket_id)
         t.gc.ask_h('confirm', {'options': ["Reveal"]}, t.user_id)
 
         # Send target's information to user
-        display_data = {'type': 'reveal', 'player': t.dump()}
-        args['self'].gc.show_h(display_data, args['self'].socket_id)
-        t.gc.tell_h("{} revealed their identity secretly to {}!", [
-                         t.user_id, args['self'].user_id])
+        if not t.gc.headless:
+            display_data = {'type': 'reveal', 'player': t.dump()}
+            args['self'].gc.show_h(display_data, args['self'].socket_id)
+        t.gc.tell("{} revealed their identity secretly to {}!", [
+                       t.user_id, args['self'].user_id])
 
     def __call__(self, args):
 
@@ -0,0 +1,27 @@
+# modifiers.py
+# Implements a player's Modifiers, the effects of specials and cards that
+# outlast the action that caused them. Each effect is a slot with a default,
+# so checking one is a plain attribute read.
+
+
+class Modifiers:
+    __slots__ = ('guardian_angel', 'special_used', 'special_active',
+                 'steal_for_damage', 'steal_all_on_kill', 'counterattack',
+                 'killed_neutral', 'attack_dice_type', 'damage_dealt_fn')
+
+    def __init__(self):
+        self.guardian_angel = False
+        self.special_used = False
+        self.special_active = False
+        self.steal_for_damage = False
+        self.steal_all_on_kill = False
+        self.counterattack = False
+        self.killed_neutral = False
+        self.attack_dice_type = "attack"
+        self.damage_dealt_fn = None  # called with the attacker after a hit
+
+    def copy(self):
+        other = Modifiers.__new__(Modifiers)
+        for name in Modifiers.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
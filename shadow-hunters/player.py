@@ -1,39 +1,197 @@
-from collections import defaultdict
-
-import concurrency as R
 import constants as C
 from agent import Agent
+from game_state import GameState
+from modifiers import Modifiers
+
+PLAYER_STATES = {s.value: s for s in C.PlayerState}
+
+
+class EquipmentList(list):
+    """A player's equipment, which keeps the player's equipment bitmask in
+    the GameState up to date however the list is modified"""
+
+    def __init__(self, owner, items=()):
+        super().__init__(items)
+        self.owner = owner
+
+    def _changed(self):
+        self.owner._equipmentChanged()
+
+    def append(self, item):
+        super().append(item)
+        self._changed()
+
+    def extend(self, items):
+        super().extend(items)
+        self._changed()
+
+    def insert(self, i, item):
+        super().insert(i, item)
+        self._changed()
+
+    def pop(self, *args):
+        item = super().pop(*args)
+        self._changed()
+        return item
+
+    def remove(self, item):
+        super().remove(item)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __setitem__(self, i, item):
+        super().__setitem__(i, item)
+        self._changed()
+
+    def __delitem__(self, i):
+        super().__delitem__(i)
+        self._changed()
 
 
 class Player:
+    __slots__ = ('user_id', '_socket_id', 'color', 'gc', '_gs', '_row',
+                 'character', '_equipment', 'modifiers', '_special_active',
+                 '_ai', 'agent', 'delexicalizations', '_dumps',
+                 '_attack_bonus', '_defense')
+
     def __init__(self, user_id, socket_id, color, ai):
         self.user_id = user_id
         self.socket_id = socket_id
         self.color = color
         self.gc = None  # game context (abbreviated for convenience)
+        self._gs = GameState(1)  # replaced by the game context's GameState
+        self._row = 0
         self.state = C.PlayerState.Hidden
         self.character = None
         self.equipment = []
         self.damage = 0
         self.location = None
-        self.modifiers = defaultdict(lambda: False)
-        self.modifiers['attack_dice_type'] = "attack"
+        self.modifiers = Modifiers()
         self.special_active = False
         self.ai = ai
         self.agent = Agent()
         self.delexicalizations = dict()
 
+    def bind(self, gs, row):
+        """Move this player's state into row `row` of the given GameState"""
+
+        self._dumps = None
+        state, damage, location = self.state, self.damage, self.location
+        self._gs, self._row = gs, row
+        self.state, self.damage, self.location = state, damage, location
+        self.setCharacter(self.character)
+        self._equipmentChanged()
+
+    def fork(self, gc):
+        """Return a copy of this player for a fork of its game context"""
+
+        other = Player.__new__(Player)
+        for name in Player.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.gc = gc
+        other._gs = gc.game_state
+        other._equipment = EquipmentList(other, self._equipment)
+        other.modifiers = self.modifiers.copy()
+        return other
+
+    # State stored in the GameState. Setters of anything that dump() shows
+    # clear the cached dumps.
+
+    @property
+    def state(self):
+        return PLAYER_STATES[self._gs.state[self._row]]
+
+    @state.setter
+    def state(self, state):
+        self._gs.set_state(self._row, state.value)
+        self._dumps = None
+
+    @property
+    def damage(self):
+        return self._gs.damage[self._row]
+
+    @damage.setter
+    def damage(self, damage):
+        self._gs.damage[self._row] = damage
+        self._dumps = None
+
+    @property
+    def location(self):
+        i = self._gs.location[self._row]
+        return self._gs.areas[i] if i >= 0 else None
+
+    @location.setter
+    def location(self, location):
+        gs = self._gs
+        gs.set_location(self._row, gs.area_index(location))
+        self._dumps = None
+
+    @property
+    def equipment(self):
+        return self._equipment
+
+    @equipment.setter
+    def equipment(self, equipment):
+        self._equipment = EquipmentList(self, equipment)
+        self._equipmentChanged()
+
+    def _equipmentChanged(self):
+        self._gs.equipment[self._row] = self._gs.equip_mask(self._equipment)
+        self._attack_bonus = sum(eq.attack_bonus for eq in self._equipment)
+        self._defense = sum(eq.defense for eq in self._equipment)
+        self._dumps = None
+
+    # Other state shown by dump()
+
+    @property
+    def socket_id(self):
+        return self._socket_id
+
+    @socket_id.setter
+    def socket_id(self, socket_id):
+        self._socket_id = socket_id
+        self._dumps = None
+
+    @property
+    def special_active(self):
+        return self._special_active
+
+    @special_active.setter
+    def special_active(self, special_active):
+        self._special_active = special_active
+        self._dumps = None
+
+    @property
+    def ai(self):
+        return self._ai
+
+    @ai.setter
+    def ai(self, ai):
+        self._ai = ai
+        self._dumps = None
+
     def setCharacter(self, character):
         self.character = character
+        alleg = character.alleg.value if character else -1
+        self._gs.set_alleg(self._row, alleg)
+        self._dumps = None
 
     def resetModifiers(self):
-        self.modifiers = defaultdict(lambda: False)
-        self.modifiers['attack_dice_type'] = "attack"
+        self.modifiers = Modifiers()
 
     def reveal(self):
 
         # Set state
         self.state = C.PlayerState.Revealed
+        if self.gc.headless:
+            return
 
         # Reveal character to frontend
         self.gc.update_h()
@@ -45,29 +203,29 @@ class Player:
     def takeTurn(self):
 
         # Announce player
-        self.gc.tell_h("It's {}'s turn!", [self.user_id])
+        self.gc.tell("It's {}'s turn!", [self.user_id])
 
         # Guardian Angel wears off
-        # if "guardian_angel" in self.modifiers:
-        if self.modifiers['guardian_angel']:
-            self.gc.tell_h("The effect of {}\'s {} wore off!",
-                           [self.user_id, "Guardian Angel"])
-            del self.modifiers["guardian_angel"]
+        if self.modifiers.guardian_angel:
+            self.gc.tell("The effect of {}\'s {} wore off!",
+                         [self.user_id, "Guardian Angel"])
+            self.modifiers.guardian_angel = False
 
         # If AI player, chance to reveal and use special at turn start
-        R.reveal_lock.acquire()
+        self.gc.reveal_lock.acquire()
         if self.ai and self.state == C.PlayerState.Hidden:
             if self.agent.choose_reveal(self, self.gc):
                 self.state = C.PlayerState.Revealed  # Guard
                 self.special_active = True  # Guard
-                R.reveal_lock.release()
+                self.gc.reveal_lock.release()
                 self.reveal()
                 self.character.special(self.gc, self, turn_pos='now')
-                self.gc.update_h()
+                if not self.gc.headless:
+                    self.gc.update_h()
             else:
-                R.reveal_lock.release()
+                self.gc.reveal_lock.release()
         else:
-            R.reveal_lock.release()
+            self.gc.reveal_lock.release()
 
         # Before turn check for special ability
         if self.special_active:
@@ -99,13 +257,13 @@ class Player:
     def _takeTurn(self):
 
         # Roll dice
-        self.gc.tell_h("{} is rolling for movement...", [self.user_id])
+        self.gc.tell("{} is rolling for movement...", [self.user_id])
         roll_result = self.rollDice('area')
 
         if self.hasEquipment("Mystic Compass"):
             # If player has mystic compass, roll again
-            self.gc.tell_h("{}'s {} lets them roll again!",
-                           [self.user_id, "Mystic Compass"])
+            self.gc.tell("{}'s {} lets them roll again!",
+                         [self.user_id, "Mystic Compass"])
             second_roll = self.rollDice('area')
 
             # Pick the preferred roll
@@ -118,13 +276,12 @@ class Player:
         if roll_result == 7:
 
             # Select an area
-            self.gc.tell_h("{} is selecting an area...", [self.user_id])
+            self.gc.tell("{} is selecting an area...", [self.user_id])
             data = {'options': self.gc.getAreas()}
             dst_name = self.gc.ask_h('select', data, self.user_id)['value']
 
             # Get Area object from area name
-            zs = self.gc.zones
-            dst = [a for z in zs for a in z.areas if a.name == dst_name][0]
+            dst = self.gc.area_by_name[dst_name]
 
         else:
 
@@ -136,7 +293,7 @@ class Player:
 
         # Move to area
         self.move(dst)
-        self.gc.tell_h("{} moves to {}!", [self.user_id, dst_name])
+        self.gc.tell("{} moves to {}!", [self.user_id, dst_name])
 
         # Take area action
         data = {'options': [dst.desc, 'Decline']}
@@ -144,7 +301,7 @@ class Player:
         if answer != 'Decline':
             self.location.action(self.gc, self)
         else:
-            self.gc.tell_h(
+            self.gc.tell(
                 '{} declined to perform their area action.', [self.user_id])
 
         # Someone could have died here, so check win conditions
@@ -156,12 +313,12 @@ class Player:
             return
 
         # Attack
-        self.attackSequence(dice_type=self.modifiers['attack_dice_type'])
+        self.attackSequence(dice_type=self.modifiers.attack_dice_type)
 
     def attackSequence(self, dice_type="attack"):
 
         # Give player option to attack or decline
-        self.gc.tell_h("{} is deciding to attack...", [self.user_id])
+        self.gc.tell("{} is deciding to attack...", [self.user_id])
         options = ["Attack other players!"]
         if not self.hasEquipment("Cursed Sword Masamune"):
             options.append("Decline")
@@ -171,15 +328,16 @@ class Player:
 
         if answer != "Decline":
             # Get attackable players
-            live_players = self.gc.getLivePlayers(lambda p: p.location)
-            targets = [p for p in live_players if (
-                    p.location.zone == self.location.zone and p != self)]
+            gs = self.gc.game_state
+            zone = gs.zone[self._row]
+            in_range = gs.in_zone(zone)
 
             if self.hasEquipment("Handgun"):
-                self.gc.tell_h("{}'s {} reverses their attack range.", [
+                self.gc.tell("{}'s {} reverses their attack range.", [
                     self.user_id, "Handgun"])
-                targets = [p for p in live_players if (
-                        p.location.zone != self.location.zone and p != self)]
+                in_range = gs.outside_zone(zone)
+
+            targets = [self.gc.players[i] for i in in_range if i != self._row]
 
             # If player has Masamune, can't decline unless there are no options
             opts = [t.user_id for t in targets]
@@ -196,7 +354,7 @@ class Player:
                 target_Player = self.gc.getLivePlayers(
                     lambda x: x.user_id == target_name
                 )[0]
-                self.gc.tell_h(
+                self.gc.tell(
                     "{} is attacking {}!",
                     [self.user_id, target_name]
                 )
@@ -204,7 +362,7 @@ class Player:
                 # Roll with the 4-sided die if the player has masamune
                 roll_result = 0
                 if self.hasEquipment("Cursed Sword Masamune"):
-                    self.gc.tell_h(
+                    self.gc.tell(
                         "{} rolls with the 4-sided die using the {}!",
                         [self.user_id, "Cursed Sword Masamune"]
                     )
@@ -215,7 +373,7 @@ class Player:
                 # If player has Machine Gun, launch attack on everyone in the
                 # zone. Otherwise, attack the target
                 if self.hasEquipment("Machine Gun"):
-                    self.gc.tell_h(
+                    self.gc.tell(
                         "{}'s {} hits everyone in their attack range!",
                         [self.user_id, "Machine Gun"]
                     )
@@ -224,7 +382,7 @@ class Player:
 
                 for t in targets:
                     # Dry run the attack if we're Bob
-                    if self.modifiers['steal_for_damage']:
+                    if self.modifiers.steal_for_damage:
                         potential_damage = self.attack(
                             t,
                             roll_result,
@@ -245,7 +403,7 @@ class Player:
                             if choose_steal:
                                 desired_eq = self.chooseEquipment(t)
                                 t.giveEquipment(self, desired_eq)
-                                self.gc.tell_h(
+                                self.gc.tell(
                                     ("{} stole {}'s {}"),
                                     [self.user_id, t.user_id, desired_eq.title, ]
                                 )
@@ -262,9 +420,9 @@ class Player:
                         damage_dealt = self.attack(t, roll_result)
 
             else:
-                self.gc.tell_h("{} declined to attack.", [self.user_id])
+                self.gc.tell("{} declined to attack.", [self.user_id])
         else:
-            self.gc.tell_h("{} declined to attack.", [self.user_id])
+            self.gc.tell("{} declined to attack.", [self.user_id])
 
     def drawCard(self, deck):
 
@@ -272,33 +430,36 @@ class Player:
         drawn = deck.drawCard()
         is_hermit = drawn.color == C.CardType.Hermit
         public_title = drawn.title if not is_hermit else 'a Hermit Card'
-        self.gc.tell_h("{} drew {}!", [self.user_id, public_title])
-        display_data = drawn.dump()
-        display_data['type'] = 'draw'
-        if not is_hermit:
-            self.gc.show_h(display_data)
-        else:
-            self.gc.show_h(display_data, self.socket_id)
+        self.gc.tell("{} drew {}!", [self.user_id, public_title])
+        headless = self.gc.headless
+        if not headless:
+            display_data = drawn.dump()
+            display_data['type'] = 'draw'
+            if not is_hermit:
+                self.gc.show_h(display_data)
+            else:
+                self.gc.show_h(display_data, self.socket_id)
 
         # Use card if it's single-use, or add to arsenal if it's equipment
         if drawn.is_equipment:
             self.gc.ask_h('confirm', {'options': [
                 "Add {} to arsenal".format(drawn.title)]},
                           self.user_id)
-            self.gc.tell_h("{} added {} to their arsenal!",
-                           [self.user_id, public_title])
             self.equipment.append(drawn)
-            self.gc.update_h()
+            self.gc.tell("{} added {} to their arsenal!",
+                         [self.user_id, public_title])
+            if not headless:
+                self.gc.update_h()
         else:
             args = {'self': self, 'card': drawn}
             drawn.use(args)
 
     def rollDice(self, type):
 
-        # Preprocess all rolls
+        # Preprocess all rolls (single-die rolls leave the other die alone)
         assert type in ["area", "attack", "6", "4"]
-        roll_4 = self.gc.die4.roll()
-        roll_6 = self.gc.die6.roll()
+        roll_4 = self.gc.die4.roll() if type != "6" else 0
+        roll_6 = self.gc.die6.roll() if type != "4" else 0
         diff = abs(roll_4 - roll_6)
         sum = roll_4 + roll_6
 
@@ -328,8 +489,9 @@ class Player:
 
         # Ask for confirmation and display results
         self.gc.ask_h('confirm', ask_data, self.user_id)
-        self.gc.show_h(display_data)
-        self.gc.tell_h(message[0], message[1])
+        if not self.gc.headless:
+            self.gc.show_h(display_data)
+        self.gc.tell(message[0], message[1])
         return result
 
     def choosePlayer(self, include_self=False, filter_fn=(lambda x: True)):
@@ -347,13 +509,13 @@ class Player:
 
         data = {'options': [p.user_id for p in opts]}
 
-        self.gc.tell_h("{} is choosing a player...", [self.user_id])
+        self.gc.tell("{} is choosing a player...", [self.user_id])
         target = self.gc.ask_h('select', data, self.user_id)['value']
 
         # Return the chosen player
         target_Player = [p for p in self.gc.getLivePlayers()
                          if p.user_id == target][0]
-        self.gc.tell_h("{} chose {}!", [self.user_id, target])
+        self.gc.tell("{} chose {}!", [self.user_id, target])
         return target_Player
 
     def chooseEquipment(self, target):
@@ -373,24 +535,23 @@ class Player:
         i = self.equipment.index(eq)
         eq = self.equipment.pop(i)
         receiver.equipment.append(eq)
-        eq.holder = receiver
 
         # Tell frontend about transfer
-        self.gc.tell_h("{} forfeited their {} to {}!", [
+        self.gc.tell("{} forfeited their {} to {}!", [
             self.user_id, eq.title, receiver.user_id])
-        self.gc.update_h()
+        if not self.gc.headless:
+            self.gc.update_h()
 
     def hasEquipment(self, equipment_name):
-        return equipment_name in [eq.title for eq in self.equipment]
+        bit = self._gs.equip_bits.get(equipment_name, 0)
+        return bool(self._gs.equipment[self._row] & bit)
 
     def attack(self, other, amount, dryrun=False):
 
-        # Compose equipment functions
-        is_attack = True
+        # Apply equipment (only to successful attacks)
         successful = (amount != 0)
-        for eq in self.equipment:
-            if eq.use:
-                amount = eq.use(is_attack, successful, amount)
+        if successful:
+            amount = max(0, amount + self._attack_bonus)
 
         # Check for spear of longinus
         has_spear = self.hasEquipment("Spear of Longinus")
@@ -398,7 +559,7 @@ class Player:
         is_revealed = self.state == C.PlayerState.Revealed
         if successful and is_hunter and is_revealed and has_spear and self.damage >= 7:
             if not dryrun:
-                self.gc.tell_h("{} strikes with their {}!", [
+                self.gc.tell("{} strikes with their {}!", [
                     self.user_id, "Spear of Longinus"])
             amount += 2
 
@@ -407,26 +568,22 @@ class Player:
 
         # If we dealt damage, some specials might have external effects
         if dealt > 0:
-            if self.modifiers['damage_dealt_fn']:
-                self.modifiers['damage_dealt_fn'](self)
+            if self.modifiers.damage_dealt_fn is not None:
+                self.modifiers.damage_dealt_fn(self)
 
         return dealt
 
     def defend(self, other, amount, dryrun=False):
 
         # Check for guardian angel
-        if self.modifiers['guardian_angel']:
+        if self.modifiers.guardian_angel:
             if not dryrun:
-                self.gc.tell_h("{}\'s {} shielded them from damage!", [
+                self.gc.tell("{}\'s {} shielded them from damage!", [
                     self.user_id, "Guardian Angel"])
             return 0
 
-        # Compose equipment functions
-        is_attack = False
-        successful = False
-        for eq in self.equipment:
-            if eq.use:
-                amount = eq.use(is_attack, successful, amount)
+        # Apply equipment
+        amount = max(0, amount - self._defense)
 
         # Return damage dealt
         dealt = amount
@@ -434,14 +591,14 @@ class Player:
             return dealt
 
         self.moveDamage(-dealt, attacker=other)
-        self.gc.tell_h("{} hit {} for {} damage!", [
+        self.gc.tell("{} hit {} for {} damage!", [
             other.user_id, self.user_id, dealt])
 
         if self.state != C.PlayerState.Dead:
             # Check for counterattack
-            if self.modifiers['counterattack']:
+            if self.modifiers.counterattack:
                 # Ask if player wants to counterattack
-                self.gc.tell_h(
+                self.gc.tell(
                     "{}, the {}, is deciding whether to counterattack!",
                     [self.user_id, "Werewolf"])
                 answer = self.gc.ask_h(
@@ -449,21 +606,22 @@ class Player:
                     self.user_id)['value']
 
                 if answer != "Decline":
-                    self.gc.tell_h("{} is counterattacking!", [self.user_id])
+                    self.gc.tell(
+                        "{} is counterattacking!", [self.user_id])
                     # Roll with the 4-sided die if the player has masamune
                     roll_result = 0
                     if self.hasEquipment("Cursed Sword Masamune"):
-                        self.gc.tell_h(
+                        self.gc.tell(
                             "{} rolls with the 4-sided die using the {}!",
                             [self.user_id, "Cursed Sword Masamune"]
                         )
                         roll_result = self.rollDice('4')
                     else:
                         roll_result = self.rollDice(
-                            self.modifiers['attack_dice_type'])
+                            self.modifiers.attack_dice_type)
                     self.attack(other, roll_result)
                 else:
-                    self.gc.tell_h(
+                    self.gc.tell(
                         "{} declined to counterattack.",
                         [self.user_id]
                     )
@@ -473,7 +631,7 @@ class Player:
     def moveDamage(self, damage_change, attacker):
 
         # Tell frontend to animate sprite
-        if damage_change < 0:
+        if damage_change < 0 and not self.gc.headless:
             self.gc.show_h({'type': 'damage', 'player': self.dump()})
 
         # Set new damage
@@ -484,56 +642,59 @@ class Player:
         return self.damage
 
     def setDamage(self, damage, attacker):
-        if damage < self.damage:
+        if damage < self.damage and not self.gc.headless:
             self.gc.show_h({'type': 'damage', 'player': self.dump()})
         self.damage = damage
         self.checkDeath(attacker)
 
     def checkDeath(self, attacker):
+        headless = self.gc.headless
         if self.damage >= self.character.max_damage:
-            self.gc.update_h()
+            if not headless:
+                self.gc.update_h()
             self.die(attacker)
-        self.gc.update_h()
+        if not headless:
+            self.gc.update_h()
 
     def die(self, attacker):
 
         # Set state to dead
-        R.reveal_lock.acquire()
+        self.gc.reveal_lock.acquire()
         self.state = C.PlayerState.Dead
-        R.reveal_lock.release()
+        self.gc.reveal_lock.release()
 
         # Report to console
-        display_data = {'type': 'die', 'player': self.dump()}
-        self.gc.show_h(display_data)
+        headless = self.gc.headless
+        if not headless:
+            display_data = {'type': 'die', 'player': self.dump()}
+            self.gc.show_h(display_data)
 
         # Equipment stealing if dead player has equipment
         if self.equipment and self != attacker:
 
-            has_silver_rosary = ("Silver Rosary" in [
-                e.title for e in attacker.equipment])
-            has_steal_all_mod = attacker.modifiers['steal_all_on_kill']
+            has_silver_rosary = attacker.hasEquipment("Silver Rosary")
+            has_steal_all_mod = attacker.modifiers.steal_all_on_kill
 
             if has_silver_rosary or has_steal_all_mod:
 
                 # Steal all of the player's equipment
                 if has_silver_rosary:
-                    self.gc.tell_h(
+                    self.gc.tell(
                         "{}'s {} let them steal all of {}'s equipment!",
                         [attacker.user_id, "Silver Rosary", self.user_id]
                     )
                 else:
                     msg = "{} ({}) stole all of {}'s equipment"
                     msg += " using their special ability!"
-                    self.gc.tell_h(
+                    self.gc.tell(
                         msg,
                         [attacker.user_id, "Bob", self.user_id]
                     )
 
                 attacker.equipment += self.equipment
-                for eq in attacker.equipment:
-                    eq.holder = attacker
                 self.equipment = []
-                self.gc.update_h()
+                if not headless:
+                    self.gc.update_h()
 
             else:
 
@@ -568,23 +729,43 @@ class Player:
             if self.character.alleg != C.Alleg.Neutral:
                 attacker.setDamage(20, attacker)
             else:
-                attacker.modifiers["killed_neutral"] = True
+                attacker.modifiers.killed_neutral = True
 
     def move(self, location):
         self.location = location
-        self.gc.update_h()
+        if not self.gc.headless:
+            self.gc.update_h()
+
+    def _dump(self):
+        if self._dumps is None:
+            private = {
+                'user_id': self.user_id,
+                'socket_id': self.socket_id,
+                'color': self.color,
+                'state': self.state.value,
+                'equipment': [eq.dump() for eq in self.equipment],
+                'damage': self.damage,
+                'character': self.character.dump() if self.character else {},
+                'location': self.location.dump() if self.location else {},
+                'special_active': self.special_active,
+                'ai': self.ai,
+                'delexicalizations': self.delexicalizations
+            }
+
+            # Hide character information if player hasn't revealed themselves
+            public = private
+            if self.state == C.PlayerState.Hidden:
+                public = dict(private, character={})
+            self._dumps = (private, public)
+        return self._dumps
 
     def dump(self):
-        return {
-            'user_id': self.user_id,
-            'socket_id': self.socket_id,
-            'color': self.color,
-            'state': self.state.value,
-            'equipment': [eq.dump() for eq in self.equipment],
-            'damage': self.damage,
-            'character': self.character.dump() if self.character else {},
-            'location': self.location.dump() if self.location else {},
-            'special_active': self.special_active,
-            'ai': self.ai,
-            'delexicalizations': self.delexicalizations
-        }
+        """Return this player's state. The dump is cached until the state
+        changes, so it must not be modified."""
+
+        return self._dump()[0]
+
+    def dumpPublic(self):
+        """Return this player's state as seen by everyone (like dump())"""
+
+        return self._dump()[1]
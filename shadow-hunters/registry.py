@@ -0,0 +1,64 @@
+import json
+
+import redis
+
+# registry.py
+# Implements the room registry, the part of each room's record that every
+# server worker has to see: its status, the names of the people in it and of
+# the players who may reconnect, the worker hosting it, and its game's last
+# public state. (Live game objects stay in the worker that hosts the room.)
+#
+# Records are JSON-serializable dicts, and are replaced rather than modified.
+# The in-process registry serves a single worker. The Redis registry shares
+# records between workers through a Redis server.
+
+
+def make_registry(url=None):
+    """Return the registry for a backend url (in-process if there is none)"""
+
+    if not url:
+        return LocalRegistry()
+    return RedisRegistry(url)
+
+
+class LocalRegistry:
+    def __init__(self):
+        self.records = {}
+
+    def get(self, room_id):
+        return self.records.get(room_id)
+
+    def create(self, room_id, record):
+        """Add a record unless the room already has one. Returns whether the
+        record was added."""
+
+        return self.records.setdefault(room_id, record) is record
+
+    def put(self, room_id, record):
+        self.records[room_id] = record
+
+    def delete(self, room_id):
+        self.records.pop(room_id, None)
+
+
+class RedisRegistry:
+    def __init__(self, url, prefix='shadow-hunters:room:'):
+        self.redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, room_id):
+        raw = self.redis.get(self.prefix + room_id)
+        return json.loads(raw) if raw is not None else None
+
+    def create(self, room_id, record):
+        """Add a record unless the room already has one. Returns whether the
+        record was added."""
+
+        return bool(self.redis.set(
+            self.prefix + room_id, json.dumps(record), nx=True))
+
+    def put(self, room_id, record):
+        self.redis.set(self.prefix + room_id, json.dumps(record))
+
+    def delete(self, room_id):
+        self.redis.delete(self.prefix + room_id)
@@ -0,0 +1,127 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from game_context import GameContext
+from elements import ElementFactory
+from player import Player
+
+# simulate.py
+# Plays batches of AI-only games across a process pool and streams the
+# outcome of every game as a line of JSON.
+#
+# Usage (from the shadow-hunters directory):
+#   python simulate.py --games 100000 --players 4-8 --workers 8
+
+
+def parse_players(spec):
+    """Parse a player count ("5") or an inclusive range ("4-8")"""
+
+    lo, _, hi = spec.partition('-')
+    lo, hi = int(lo), int(hi or lo)
+    if not 4 <= lo <= hi <= 8:
+        raise ValueError("players must be between 4 and 8")
+    return lo, hi
+
+
+def play_game(job):
+    """Play a single seeded game and return a summary of its outcome"""
+
+    game_id, seed, lo, hi = job
+    n_players = random.Random(seed).randint(lo, hi)
+
+    players = [Player("CPU_{}".format(i), str(i), 'unused', True)
+               for i in range(1, n_players + 1)]
+    by_name = {p.user_id: p for p in players}
+
+    def ask_h(form, data, user_id):
+        p = by_name[user_id]
+        return p.agent.choose_action(data['options'], player=p, gc=p.gc)
+
+    ef = ElementFactory()
+    gc = GameContext(
+        players=players,
+        characters=ef.CHARACTERS,
+        black_cards=ef.BLACK_DECK,
+        white_cards=ef.WHITE_DECK,
+        hermit_cards=ef.HERMIT_DECK,
+        areas=ef.AREAS,
+        ask_h=ask_h,
+        tell_h=lambda x, y, *z: 0,
+        show_h=lambda x, *y: 0,
+        update_h=lambda: 0,
+        headless=True,
+        seed=seed
+    )
+    winners = gc.play()
+
+    return {
+        'game': game_id,
+        'seed': seed,
+        'n_players': n_players,
+        'rounds': gc.round_count,
+        'winners': [w.user_id for w in winners],
+        'characters': {p.user_id: p.character.name for p in players},
+        'allegiances': {p.user_id: p.character.alleg.name for p in players}
+    }
+
+
+def run_batch(games, players=(4, 8), workers=None, seed=0, chunksize=64):
+    """Play `games` games over `workers` processes, yielding each outcome as
+    soon as it finishes (not necessarily in order). Game i is seeded with
+    seed + i, so any single game can be replayed with play_game()."""
+
+    lo, hi = players
+    jobs = ((i, seed + i, lo, hi) for i in range(games))
+    if workers == 1:
+        for job in jobs:
+            yield play_game(job)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        for outcome in pool.imap_unordered(play_game, jobs, chunksize):
+            yield outcome
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Play headless AI-only games of Shadow Hunters.")
+    parser.add_argument('--games', type=int, default=1000,
+                        help="number of games to play")
+    parser.add_argument('--players', type=parse_players, default=(4, 8),
+                        help="players per game, e.g. 5 or 4-8")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed of the first game")
+    parser.add_argument('--chunksize', type=int, default=64,
+                        help="games handed to a worker at a time")
+    parser.add_argument('--quiet', action='store_true',
+                        help="only report throughput, not outcomes")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    played = 0
+    outcomes = run_batch(args.games, args.players, args.workers,
+                         args.seed, args.chunksize)
+    for outcome in outcomes:
+        played += 1
+        if not args.quiet:
+            print(json.dumps(outcome))
+        if played % 1000 == 0:
+            rate = played / (time.time() - start)
+            print("{} games, {:.1f} games/sec".format(played, rate),
+                  file=sys.stderr)
+
+    elapsed = time.time() - start
+    print("Played {} games in {:.2f}s ({:.1f} games/sec)".format(
+        played, elapsed, played / elapsed if elapsed else 0.0),
+        file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
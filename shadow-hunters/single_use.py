@@ -13,9 +13,9 @@ def first_aid(args):
         'confirm', {'options': ["Use First Aid"]}, args['self'].user_id)
     target_Player = args['self'].choosePlayer(include_self=True)
     target_Player.setDamage(7, args['self'])
-    args['self'].gc.tell_h("{} applied {} to {}!", [
-                           args['self'].user_id, args['card'].title,
-                           target_Player.user_id])
+    args['self'].gc.tell("{} applied {} to {}!", [
+                         args['self'].user_id, args['card'].title,
+                         target_Player.user_id])
 
 
 def judgement(args):
@@ -50,7 +50,7 @@ def advent(args):
     decision = args['self'].gc.ask_h(
         'yesno', data, args['self'].user_id)['value']
     if decision == "Do nothing":
-        args['self'].gc.tell_h("{} did nothing.", [args['self'].user_id])
+        args['self'].gc.tell("{} did nothing.", [args['self'].user_id])
     elif decision == "Reveal and heal fully":
         args['self'].reveal()
         args['self'].setDamage(0, args['self'])
@@ -70,7 +70,7 @@ def disenchant_mirror(args):
     decision = args['self'].gc.ask_h(
         'yesno', data, args['self'].user_id)['value']
     if decision == "Do nothing":
-        args['self'].gc.tell_h("{} did nothing.", [args['self'].user_id])
+        args['self'].gc.tell("{} did nothing.", [args['self'].user_id])
     else:
         args['self'].reveal()
 
@@ -88,7 +88,7 @@ def blessing(args):
 
     # Heal target player
     target.moveDamage(roll_result, args['self'])
-    args['self'].gc.tell_h("The blessing healed {}!", [target.user_id])
+    args['self'].gc.tell("The blessing healed {}!", [target.user_id])
 
 
 def chocolate(args):
@@ -107,7 +107,7 @@ def chocolate(args):
     decision = args['self'].gc.ask_h(
         'yesno', data, args['self'].user_id)['value']
     if decision == "Do nothing":
-        args['self'].gc.tell_h("{} did nothing.", [args['self'].user_id])
+        args['self'].gc.tell("{} did nothing.", [args['self'].user_id])
     elif decision == "Reveal and heal fully":
         args['self'].reveal()
         args['self'].setDamage(0, args['self'])
@@ -132,7 +132,7 @@ def guardian_angel(args):
     args['self'].gc.ask_h(
         'confirm', {'options': ["Summon a Guardian Angel"]},
         args['self'].user_id)
-    args['self'].modifiers['guardian_angel'] = True
+    args['self'].modifiers.guardian_angel = True
 
 # Black single-use cards
 
@@ -147,8 +147,8 @@ def bloodthirsty_spider(args):
     target = args['self'].choosePlayer()
 
     if target.hasEquipment("Talisman"):
-        args['self'].gc.tell_h("{}'s {} protected them from damage!", [
-                               target.user_id, "Talisman"])
+        args['self'].gc.tell("{}'s {} protected them from damage!", [
+                             target.user_id, "Talisman"])
     else:
         target.moveDamage(-2, args['self'])
     args['self'].moveDamage(-2, args['self'])
@@ -162,8 +162,8 @@ def vampire_bat(args):
     target = args['self'].choosePlayer()
 
     if target.hasEquipment("Talisman"):
-        args['self'].gc.tell_h("{}'s {} protected them from damage!", [
-                               target.user_id, "Talisman"])
+        args['self'].gc.tell("{}'s {} protected them from damage!", [
+                             target.user_id, "Talisman"])
     else:
         target.moveDamage(-2, args['self'])
         args['self'].moveDamage(1, args['self'])
@@ -182,8 +182,8 @@ def moody_goblin(args):
         equip_Equipment = args['self'].chooseEquipment(target_Player)
         target_Player.giveEquipment(args['self'], equip_Equipment)
     else:
-        args['self'].gc.tell_h("Nobody has any items for {} to steal.", [
-                               args['self'].user_id])
+        args['self'].gc.tell("Nobody has any items for {} to steal.", [
+                             args['self'].user_id])
 
 
 def diabolic_ritual(args):
@@ -198,7 +198,7 @@ def diabolic_ritual(args):
     decision = args['self'].gc.ask_h(
         'yesno', data, args['self'].user_id)['value']
     if decision == "Do nothing":
-        args['self'].gc.tell_h("{} did nothing.", [args['self'].user_id])
+        args['self'].gc.tell("{} did nothing.", [args['self'].user_id])
     else:
         args['self'].reveal()
         args['self'].setDamage(0, args['self'])
@@ -218,7 +218,7 @@ def banana_peel(args):
         'yesno', data, args['self'].user_id)['value']
     if decision == "Give an equipment card":
         # Choose an equipment card to give away
-        args['self'].gc.tell_h(
+        args['self'].gc.tell(
             "{} is choosing an equipment card to give away...",
             [args['self'].user_id]
         )
@@ -231,8 +231,8 @@ def banana_peel(args):
     else:
         # Take 1 damage
         args['self'].moveDamage(-1, args['self'])
-        args['self'].gc.tell_h("{} took {} damage.", [
-                               args['self'].user_id, "1"])
+        args['self'].gc.tell("{} took {} damage.", [
+                             args['self'].user_id, "1"])
 
 
 def dynamite(args):
@@ -241,14 +241,14 @@ def dynamite(args):
     # Roll to find out which area gets hit
     args['self'].gc.ask_h(
         'confirm', {'options': ["Light the fuse"]}, args['self'].user_id)
-    args['self'].gc.tell_h("{} is rolling for where the dynamite lands...", [
-                           args['self'].user_id])
+    args['self'].gc.tell("{} is rolling for where the dynamite lands...", [
+                         args['self'].user_id])
     roll_result = args['self'].rollDice('area')
 
     # Hit area corresponding to roll number
     if roll_result == 7:
         # No area has 7 on it
-        args['self'].gc.tell_h("Nothing happens.", [])
+        args['self'].gc.tell("Nothing happens.", [])
 
     else:
         # Get area from roll result
@@ -256,12 +256,12 @@ def dynamite(args):
         destination = destination_Area.name
 
         # Hit all players in area for 3 damage
-        args['self'].gc.tell_h("{} blew up the {}!", ["Dynamite", destination])
+        args['self'].gc.tell("{} blew up the {}!", ["Dynamite", destination])
         affected_players = args['self'].gc.getPlayersAt(destination)
         for p in affected_players:
             if p.hasEquipment("Talisman"):
-                args['self'].gc.tell_h("{}'s {} protected them from damage!", [
-                                       p.user_id, "Talisman"])
+                args['self'].gc.tell("{}'s {} protected them from damage!", [
+                                     p.user_id, "Talisman"])
             else:
                 p.moveDamage(-3, args['self'])
 
@@ -281,9 +281,9 @@ def spiritual_doll(args):
     # If roll is >= 5, user takes 3 damage. Otherwise, target takes 3 damage.
     if roll_result >= 5:
         args['self'].moveDamage(-3, args['self'])
-        args['self'].gc.tell_h('The {} backfired on {}!', [
-                               args['card'].title, args['self'].user_id])
+        args['self'].gc.tell('The {} backfired on {}!', [
+                             args['card'].title, args['self'].user_id])
     else:
         target.moveDamage(-3, args['self'])
-        args['self'].gc.tell_h('The {} cursed {}!', [
-                               args['card'].title, target.user_id])
+        args['self'].gc.tell('The {} cursed {}!', [
+                             args['card'].title, target.user_id])
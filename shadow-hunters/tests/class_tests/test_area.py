@@ -51,12 +51,7 @@ def test_getAdjacent():
         resource_id="b_id"
     )
     z = Zone([a, b])
-    for x in z.areas:
-        x.zone = z
-
-    assert a.zone == z
-    assert b.zone == z
 
     # Test adjacency
-    assert a.getAdjacent() == b
-    assert b.getAdjacent() == a
+    assert z.getAdjacent(a) == b
+    assert z.getAdjacent(b) == a
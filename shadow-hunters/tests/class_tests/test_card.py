@@ -14,7 +14,6 @@ def test_fields():
         title="card_title",
         desc="card_desc",
         color=C.CardType.White,
-        holder=None,
         is_equip=False,
         use=lambda: 5,
     )
@@ -23,10 +22,13 @@ def test_fields():
     assert c.title == "card_title"
     assert c.desc == "card_desc"
     assert c.color == C.CardType.White
-    assert c.holder is None
     assert not c.is_equipment
     assert c.use() == 5
 
+    # test that cards don't take per-game fields
+    with pytest.raises(AttributeError):
+        c.holder = None
+
     # test dump
     dump = c.dump()
     assert dump['title'] == "card_title"
@@ -11,7 +11,6 @@ c1 = Card(
     title="Card 1",
     desc="Some card",
     color=None,  # placeholder
-    holder=None,  # placeholder
     is_equip=False,
     use=lambda: 0  # placeholder
 )
@@ -20,7 +19,6 @@ c2 = Card(
     title="Card 2",
     desc="Another card",
     color=None,  # placeholder
-    holder=None,  # placeholder
     is_equip=True,
     use=lambda: 1  # placeholder
 )
@@ -33,7 +31,8 @@ def test_fields():
     d = Deck(cards=card_list)
 
     # test fields
-    assert d.cards == card_list
+    assert d.catalog == tuple(card_list)
+    assert sorted(d.cards, key=id) == sorted(card_list, key=id)
     assert not d.discard
 
 
@@ -108,3 +107,20 @@ def test_exceptions():
 
     with pytest.raises(ValueError):
         d2 = Deck([1, 2, 3])
+
+
+def test_shared_catalog():
+    d1 = Deck(cards=(c1, c2))
+    d2 = Deck(cards=[c1, c2])
+
+    # Check that decks over the same cards share their catalog index
+    assert d1._index is d2._index
+    assert d1.catalog == d2.catalog
+
+    # Check that cards keep their identity through draws and reshuffles
+    # (the equipment card only goes back when it is discarded)
+    drawn = [d1.drawCard() for _ in range(2)]
+    d1.addToDiscard(c2)
+    assert {id(c) for c in drawn} == {id(c) for c in d1.discard}
+    redrawn = [d1.drawCard() for _ in range(2)]
+    assert {id(c) for c in redrawn} == {id(c1), id(c2)}
@@ -1,6 +1,7 @@
 import pytest
+import random
 
-from die import Die
+from die import Die, BLOCK_SIZE
 
 # test_die.py
 # Tests for the Die object
@@ -45,3 +46,17 @@ def test_roll():
 def test_exceptions():
     with pytest.raises(ValueError):
         d = Die(0)
+
+
+def test_seeded_rolls():
+
+    # Check that rolls are reproducible from a seed across block refills
+    d1 = Die(6, random.Random(11))
+    d2 = Die(6, random.Random(11))
+    rolls = [d1.roll() for _ in range(3 * BLOCK_SIZE)]
+    assert rolls == [d2.roll() for _ in range(3 * BLOCK_SIZE)]
+
+    # Check that the block is only refilled once it runs out
+    assert not d1.block
+    d1.roll()
+    assert len(d1.block) == BLOCK_SIZE - 1
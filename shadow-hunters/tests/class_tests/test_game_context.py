@@ -2,6 +2,9 @@ import pytest
 
 import constants as C
 from helpers import fresh_gc_ef
+from game_context import GameContext
+from elements import ElementFactory
+from player import Player
 import random
 
 # test_game_context.py
@@ -28,11 +31,23 @@ def test_fields():
         for p in gc.players:
             assert p.gc == gc
             assert p.character is not None
-        for a in ef.AREAS:
-            assert a.zone is not None
+        for z in gc.zones:
+            for a in z.areas:
+                assert gc.game_state.zone_of(a) == z
         assert len(gc.zones) == 3
         assert [len(z.areas) == 2 for z in gc.zones]
 
+    # test area lookups
+    areas = [a for z in gc.zones for a in z.areas]
+    assert gc.getAreas() == [a.name for a in areas]
+    for a in areas:
+        assert all(gc.getAreaFromRoll(r) is a for r in a.domain)
+    assert gc.getAreaFromRoll(7) is None
+    church = gc.area_by_name["Church"]
+    gc.players[0].move(church)
+    assert gc.getPlayersAt("Church") == [gc.players[0]]
+    assert gc.getPlayersAt("Nowhere") == []
+
     # test dump
     public, private = gc.dump()
     # assert private == [p.dump() for p in gc.players]
@@ -94,3 +109,219 @@ def test_play():
     # Check that a game plays to completion
     gc.play()
     assert 1
+
+
+def test_headless(monkeypatch):
+
+    # Check that a headless game never builds output for its handlers. The
+    # raising handlers are installed after construction, so any call site
+    # that skips its headless guard fails the test.
+    def no_output(*args):
+        raise AssertionError("headless game produced output")
+
+    monkeypatch.setattr(Player, 'dump', no_output)
+    for seed in range(C.N_GAMEPLAY_TESTS):
+        random.seed(seed)
+        ef = ElementFactory()
+        gc = GameContext(
+            players=[Player("CPU_{}".format(i), str(i), 'unused', True)
+                     for i in range(1, 7)],
+            characters=ef.CHARACTERS,
+            black_cards=ef.BLACK_DECK,
+            white_cards=ef.WHITE_DECK,
+            hermit_cards=ef.HERMIT_DECK,
+            areas=ef.AREAS,
+            ask_h=lambda x, y, z: {'value': random.choice(y['options'])},
+            tell_h=no_output,
+            show_h=no_output,
+            update_h=no_output,
+            headless=True
+        )
+        gc.tell_h = gc.show_h = gc.update_h = no_output
+        assert gc.headless
+        assert gc.play()
+
+
+def test_dump():
+    gc, ef = fresh_gc_ef()
+    p0, p1 = gc.players[0], gc.players[1]
+
+    # Check that hidden characters are only in the private state
+    public, private = gc.dump()
+    assert public['players'][0]['character'] == {}
+    assert private[0]['character']['name'] == p0.character.name
+    assert len(public['zones']) == 3
+    assert len(public['characters']) == len(gc.characters)
+
+    # Check that dumps are reused until something changes
+    assert gc.dump() is gc.dump()
+    p1.move(gc.zones[0].areas[0])
+    new_public, new_private = gc.dump()
+    assert new_private[0] is private[0]
+    assert new_private[1] is not private[1]
+    assert new_private[1]['location']['name'] == p1.location.name
+    assert new_public['zones'] is public['zones']
+
+    # Check that every kind of change is picked up
+    changes = [
+        lambda: setattr(p0, 'damage', 2),
+        lambda: setattr(p0, 'state', C.PlayerState.Revealed),
+        lambda: p0.equipment.append(ef.WHITE_DECK.cards[0]),
+        lambda: setattr(p0, 'special_active', True),
+        lambda: setattr(p0, 'ai', False),
+        lambda: setattr(p0, 'socket_id', 'new_sid')
+    ]
+    for change in changes:
+        before = gc.dump()[1][0]
+        change()
+        assert gc.dump()[1][0] is not before
+    assert gc.dump()[1][0] == p0.dump()
+    assert gc.dump()[0]['players'][0]['character']['name'] == (
+        p0.character.name)
+    assert gc.dump()[1][0]['socket_id'] == 'new_sid'
+
+
+def test_play_steps():
+
+    # Check that stepping a game plays the same game as play()
+    gc, ef = fresh_gc_ef(6, seed=5)
+    expected = gc.play(debug=True)
+    gc, ef = fresh_gc_ef(6, seed=5)
+    steps = gc.play_steps(debug=True)
+    decision = next(steps)
+    try:
+        while True:
+            assert decision.user_id in [p.user_id for p in gc.players]
+            answer = {'value': gc.agent_rng.choice(decision.data['options'])}
+            decision = steps.send(answer)
+    except StopIteration as done:
+        assert done.value == expected
+
+    # Check that many paused games can be stepped side by side
+    games = [fresh_gc_ef(5, seed=i)[0] for i in range(10)]
+    steps = {gc: gc.play_steps() for gc in games}
+    pending = {gc: next(s) for gc, s in steps.items()}
+    winners = {}
+    while pending:
+        for gc, decision in list(pending.items()):
+            answer = {'value': gc.agent_rng.choice(decision.data['options'])}
+            try:
+                pending[gc] = steps[gc].send(answer)
+            except StopIteration as done:
+                winners[gc] = [p.user_id for p in done.value]
+                del pending[gc]
+    for i, gc in enumerate(games):
+        other, _ = fresh_gc_ef(5, seed=i)
+        assert [p.user_id for p in other.play()] == winners[gc]
+
+    # Check that abandoning a game restores its ask handler
+    gc, ef = fresh_gc_ef(seed=1)
+    ask_h = gc.ask_h
+    steps = gc.play_steps()
+    next(steps)
+    steps.close()
+    assert gc.ask_h is ask_h
+
+
+def test_fork():
+    gc, ef = fresh_gc_ef()
+    p0 = gc.players[0]
+    p0.equipment.append(ef.WHITE_DECK.catalog[0])
+
+    # Check that the fork shares definitions but not state
+    fork = gc.fork()
+    f0 = fork.players[0]
+    assert fork.headless
+    assert fork.characters is gc.characters
+    assert fork.zones is gc.zones
+    assert fork.white_cards.catalog is gc.white_cards.catalog
+    assert f0.character is p0.character and f0.gc is fork
+    assert f0.equipment == p0.equipment
+    assert [p.user_id for p in fork.turn_order] == [
+        p.user_id for p in gc.turn_order]
+
+    # Check that changes to the fork don't leak into the original game
+    f0.setDamage(20, f0)
+    fork.players[1].equipment.append(ef.BLACK_DECK.catalog[0])
+    fork.white_cards.drawCard()
+    assert f0.state == C.PlayerState.Dead and not f0.equipment
+    assert p0.state != C.PlayerState.Dead and p0.damage == 0
+    assert len(p0.equipment) == 1 and not gc.players[1].equipment
+    assert len(gc.white_cards.cards) == len(fork.white_cards.cards) + 1
+
+    # Check that both games play to completion independently
+    assert fork.play()
+    assert not gc.game_over
+    assert gc.play()
+
+
+def test_fork_handlers():
+    gc, ef = fresh_gc_ef()
+
+    # Check that handlers and generators can be plugged into a fork
+    told = []
+    fork = gc.fork(
+        ask_h=lambda x, y, z: {'value': y['options'][0]},
+        tell_h=lambda x, y, *z: told.append(x),
+        rng=random.Random(1)
+    )
+    assert not fork.headless
+    assert fork.die4.rng is fork.dice_rng
+    assert fork.dice_rng is not gc.dice_rng
+    fork.players[0].takeTurn()
+    assert told
+
+
+def test_seed():
+
+    # Check that a game replays exactly from its seed
+    hashes = []
+    for _ in range(2):
+        gc, ef = fresh_gc_ef(6, seed=42)
+        hashes.append(gc.play(debug=True))
+    assert hashes[0] == hashes[1]
+    assert gc.seed == 42
+
+    # Check that the agent stream doesn't affect the dice or decks
+    a, _ = fresh_gc_ef(6, seed=7)
+    b, _ = fresh_gc_ef(6, seed=7)
+    b.agent_rng.random()
+    assert [p.character.name for p in a.players] == [
+        p.character.name for p in b.players]
+    assert [c.title for c in a.white_cards.cards] == [
+        c.title for c in b.white_cards.cards]
+    assert [a.die6.roll() for _ in range(50)] == [
+        b.die6.roll() for _ in range(50)]
+
+
+def test_fork_streams():
+    gc, ef = fresh_gc_ef(seed=3)
+    gc.die4.roll()
+
+    # Check that forks continue the game's streams unless given a generator
+    a, b = gc.fork(), gc.fork()
+    assert [a.die4.roll() for _ in range(300)] == [
+        b.die4.roll() for _ in range(300)]
+    assert a.white_cards.drawCard() is b.white_cards.drawCard()
+    c = gc.fork(rng=random.Random(9))
+    assert c.dice_rng.getstate() != gc.dice_rng.getstate()
+
+
+def test_shared_catalog():
+    a, a_ef = fresh_gc_ef(5, seed=1)
+    b, b_ef = fresh_gc_ef(5, seed=2)
+
+    # Check that games share the catalog's elements, but have their own
+    # decks and zones
+    assert set(a_ef.WHITE_DECK.catalog) == set(b_ef.WHITE_DECK.catalog)
+    assert a_ef.WHITE_DECK is not b_ef.WHITE_DECK
+    assert set(map(id, a_ef.CHARACTERS)) == set(map(id, b_ef.CHARACTERS))
+    a_areas = [ar for z in a.zones for ar in z.areas]
+    b_areas = [ar for z in b.zones for ar in z.areas]
+    assert set(map(id, a_areas)) == set(map(id, b_areas))
+    assert not set(map(id, a.zones)) & set(map(id, b.zones))
+
+    # Check that playing a game leaves the other game's layout alone
+    zones = [b.game_state.zone_of(ar) for ar in b_areas]
+    a.play()
+    assert [b.game_state.zone_of(ar) for ar in b_areas] == zones
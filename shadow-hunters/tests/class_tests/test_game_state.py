@@ -0,0 +1,132 @@
+import pytest
+
+from game_state import GameState
+from player import Player
+import helpers as H
+import constants as C
+
+# test_game_state.py
+# Tests for the GameState object
+
+
+def test_fields():
+
+    # test initialization
+    gs = GameState(3)
+
+    # test fields
+    assert list(gs.damage) == [0, 0, 0]
+    assert list(gs.state) == [C.PlayerState.Hidden.value] * 3
+    assert list(gs.location) == [-1, -1, -1]
+    assert list(gs.equipment) == [0, 0, 0]
+    assert not gs.draw_piles and not gs.discard_piles
+
+
+def test_copy():
+    gc, ef = H.fresh_gc_ef()
+    gs = gc.game_state
+
+    # Check that a copy is equal but independent
+    other = gs.copy()
+    assert other.damage == gs.damage and other.damage is not gs.damage
+    assert other.draw_piles == gs.draw_piles
+    assert other.areas is gs.areas
+    other.damage[0] = 5
+    other.draw_piles[0].pop()
+    assert gs.damage[0] == 0
+    assert other.draw_piles[0] != gs.draw_piles[0]
+
+
+def test_indexes():
+    gc, ef = H.fresh_gc_ef()
+    gs = gc.game_state
+
+    # Check that areas and zones are registered in zone order
+    assert gs.zones == gc.zones
+    assert gs.areas == [a for z in gc.zones for a in z.areas]
+    assert gs.area_index(None) == -1
+    assert gs.zone_index(gc.zones[2]) == 2
+
+    # Check that equipment bits are distinct
+    bits = [gs.equip_bit(t) for t in ["Talisman", "Handgun", "Talisman"]]
+    assert bits[0] == bits[2] and bits[0] != bits[1]
+
+
+def test_player_view():
+    gc, ef = H.fresh_gc_ef()
+    gs = gc.game_state
+    p1 = gc.players[1]
+
+    # Check that player fields read and write through the GameState
+    p1.damage = 4
+    assert gs.damage[1] == 4
+    gs.state[1] = C.PlayerState.Revealed.value
+    assert p1.state == C.PlayerState.Revealed
+    assert gs.alleg[1] == p1.character.alleg.value
+
+    a = H.get_area_by_name(gc, "Church")
+    p1.move(a)
+    assert gs.areas[gs.location[1]] == a
+    assert gs.zones[gs.zone[1]] == gs.zone_of(a)
+    assert gs.at_area(gs.location[1]) == [1]
+    assert 1 in gs.in_zone(gs.zone[1])
+    assert 1 not in gs.outside_zone(gs.zone[1])
+
+    # Check that the occupancy index follows moves and copies
+    other = gs.copy()
+    p1.move(H.get_area_by_name(gc, "Cemetery"))
+    assert 1 not in gs.at_area(gs.area_index(a))
+    assert 1 in gs.in_zone(gs.zone[1])
+    assert other.at_area(gs.area_index(a)) == [1]
+    p1.location = None
+    assert all(1 not in gs.in_zone(z) for z in range(len(gs.zones)))
+    assert 1 not in gs.outside_zone(0)
+
+    # Check that equipment changes update the bitmask
+    talisman = H.get_card_by_title(ef, "Talisman")
+    p1.equipment.append(talisman)
+    assert p1.hasEquipment("Talisman")
+    assert gs.holding("Talisman") == [1]
+    p1.equipment.pop()
+    assert not p1.hasEquipment("Talisman")
+    p1.equipment = [talisman]
+    assert gs.holding("Talisman") == [1]
+
+    # Check that dead players are only in dead()
+    p1.setDamage(14, p1)
+    assert 1 in gs.dead() and 1 not in gs.live()
+    assert gs.location[1] == -1
+
+
+def test_bind():
+
+    # Check that a player keeps its state when it joins a GameState
+    p = Player('Max', 'socket_id', 'c', False)
+    p.damage = 3
+    gs = GameState(2)
+    p.bind(gs, 1)
+    assert gs.damage[1] == 3
+    assert p.damage == 3
+
+
+def test_allegiance_counts():
+    gc, ef = H.fresh_gc_ef(6)
+    gs = gc.game_state
+
+    # Check that every player is initially counted as alive
+    for alleg in C.Alleg:
+        n = len([p for p in gc.players if p.character.alleg == alleg])
+        assert gs.live_count[alleg.value] == n
+        assert gs.dead_count[alleg.value] == 0
+    assert not gs.death_order
+
+    # Check that deaths move players between the counts, in order
+    h = H.get_a_hunter(gc)
+    s = H.get_a_shadow(gc)
+    h.setDamage(14, h)
+    s.setDamage(14, s)
+    assert gs.live_count[C.Alleg.Hunter.value] == 1
+    assert gs.dead_count[C.Alleg.Hunter.value] == 1
+    assert gs.dead_count[C.Alleg.Shadow.value] == 1
+    assert gs.death_order == [gc.players.index(h), gc.players.index(s)]
+    assert sum(gs.live_count) == len(gc.getLivePlayers())
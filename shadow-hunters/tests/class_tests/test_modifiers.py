@@ -0,0 +1,42 @@
+import pytest
+import copy
+import pickle
+
+from modifiers import Modifiers
+import specials
+
+# test_modifiers.py
+# Tests for the Modifiers object
+
+
+def test_fields():
+
+    # test initialization
+    m = Modifiers()
+
+    # test fields
+    assert not m.guardian_angel
+    assert not m.special_used
+    assert m.attack_dice_type == "attack"
+    assert m.damage_dealt_fn is None
+
+    # test that unknown modifiers are rejected
+    with pytest.raises(AttributeError):
+        m.guardian_angle = True
+
+
+def test_copy():
+    m = Modifiers()
+    m.counterattack = True
+    m.damage_dealt_fn = specials.vampire_heal
+
+    # Check that copies are independent of the original
+    other = m.copy()
+    other.counterattack = False
+    assert m.counterattack and not other.counterattack
+    assert other.damage_dealt_fn is specials.vampire_heal
+
+    # Check that modifiers pickle and deep copy
+    for c in [pickle.loads(pickle.dumps(m)), copy.deepcopy(m)]:
+        assert c.counterattack
+        assert c.damage_dealt_fn is specials.vampire_heal
@@ -26,7 +26,7 @@ def test_fields():
     assert not p.character
     assert not p.location
     assert not p.equipment
-    assert p.modifiers['attack_dice_type'] == 'attack'
+    assert p.modifiers.attack_dice_type == 'attack'
     assert p.damage == 0
     assert not p.ai
 
@@ -117,6 +117,14 @@ def test_rollDice():
     for _ in range(C.N_ELEMENT_TESTS):
         assert 0 <= p1.rollDice('attack') <= 5
 
+    # Check that single-die rolls don't roll the other die
+    gc.die6.state = None
+    p1.rollDice('4')
+    assert gc.die6.state is None
+    gc.die4.state = None
+    p1.rollDice('6')
+    assert gc.die4.state is None
+
 
 def test_choosePlayer():
 
@@ -159,7 +167,6 @@ def test_giveEquipment():
     p1.giveEquipment(p2, roly_hobe)
 
     # Check that P1 lost holy robe, check that P2 got it
-    assert roly_hobe.holder == p2
     assert not p1.equipment
     assert roly_hobe in p2.equipment
 
@@ -202,6 +209,16 @@ def test_defend():
     p1.defend(p2, 5)
     assert p1.damage == 5
 
+    # Check that equipment reduces damage, and stops when it is given away
+    robe = H.get_card_by_title(ef, "Holy Robe")
+    p1.damage = 0
+    p1.equipment.append(robe)
+    assert p1.defend(p2, 5) == 4
+    assert p1.defend(p2, 1, dryrun=True) == 0
+    p1.giveEquipment(p2, robe)
+    assert p1.defend(p2, 5, dryrun=True) == 5
+    assert p2.attack(p1, 1, dryrun=True) == 0
+
 
 def test_moveDamage():
     p = H.fresh_gc_ef()[0].players[0]
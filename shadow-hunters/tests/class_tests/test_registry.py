@@ -0,0 +1,95 @@
+import pytest
+import redis
+import socketserver
+import threading
+
+from registry import make_registry, LocalRegistry, RedisRegistry
+
+# test_registry.py
+# Tests for the room registries
+
+
+class StandInHandler(socketserver.StreamRequestHandler):
+    """Serves GET, SET [NX] and DEL over the Redis protocol"""
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            n = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(n + 2)[:-2].decode())
+        return args
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            cmd = args[0].upper()
+            if cmd == 'GET' and args[1] in store:
+                v = store[args[1]].encode()
+                self.wfile.write(b'$%d\r\n%s\r\n' % (len(v), v))
+            elif cmd == 'GET' or (cmd == 'SET' and 'NX' in args[3:] and
+                                  args[1] in store):
+                self.wfile.write(b'$-1\r\n')
+            elif cmd == 'SET':
+                store[args[1]] = args[2]
+                self.wfile.write(b'+OK\r\n')
+            elif cmd == 'DEL':
+                n = int(store.pop(args[1], None) is not None)
+                self.wfile.write(b':%d\r\n' % n)
+            else:
+                self.wfile.write(b'-ERR unknown command\r\n')
+
+
+@pytest.fixture
+def stand_in():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    server.store = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def check_registry(registry):
+
+    # Check that records can be created once, then replaced and deleted
+    record = {'status': 'LOBBY', 'names': ['Max'], 'public': None}
+    assert registry.get('room') is None
+    assert registry.create('room', record)
+    assert not registry.create('room', {'status': 'GAME'})
+    assert registry.get('room') == record
+    registry.put('room', {'status': 'GAME', 'names': []})
+    assert registry.get('room')['status'] == 'GAME'
+    registry.delete('room')
+    assert registry.get('room') is None
+    registry.delete('room')
+
+
+def test_local_registry():
+    assert isinstance(make_registry(None), LocalRegistry)
+    check_registry(LocalRegistry())
+
+
+def test_redis_registry(stand_in):
+    host, port = stand_in.server_address
+    registry = make_registry('redis://{}:{}/0'.format(host, port))
+    assert isinstance(registry, RedisRegistry)
+    check_registry(registry)
+
+    # Check that records are shared between registries, under a prefix
+    other = RedisRegistry('redis://{}:{}'.format(host, port))
+    registry.create('shared', {'names': ['Amrit']})
+    assert other.get('shared') == {'names': ['Amrit']}
+    assert list(stand_in.store) == ['shadow-hunters:room:shared']
+
+    # Check that server errors are raised
+    with pytest.raises(redis.ResponseError):
+        registry.redis.execute_command('FLUSHALL')
+    with pytest.raises(ValueError):
+        make_registry('http://localhost')
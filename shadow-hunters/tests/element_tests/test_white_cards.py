@@ -194,7 +194,7 @@ def test_guardian_angel():
 
         # Check that p1 is immune to direct attacks
         c.use({'self': p1, 'card': c})
-        assert p1.modifiers['guardian_angel']
+        assert p1.modifiers.guardian_angel
         p2.attack(p1, 5)
         assert p1.damage == 0
 
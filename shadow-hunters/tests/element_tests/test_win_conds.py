@@ -63,13 +63,14 @@ def test_bob_win():
 
     # Check that Bob hasn't won initially, or with 4 equips
     assert not p.character.win_cond(gc, p)
-    p.equipment = ['dummy_equipment'] * 4
+    dummy_equipment = H.get_card_by_title(ef, "Talisman")
+    p.equipment = [dummy_equipment] * 4
     assert not p.character.win_cond(gc, p)
 
     # Check that Bob wins if we give him 5 equipment cards, or more
-    p.equipment = ['dummy_equipment'] * 5
+    p.equipment = [dummy_equipment] * 5
     assert p.character.win_cond(gc, p)
-    p.equipment = ['dummy_equipment'] * 10
+    p.equipment = [dummy_equipment] * 10
     assert p.character.win_cond(gc, p)
 
 def test_bob_kill_win():
@@ -0,0 +1,50 @@
+import pytest
+
+import simulate as S
+
+# test_simulate.py
+# Tests for the batch simulator
+
+
+def test_parse_players():
+    assert S.parse_players("5") == (5, 5)
+    assert S.parse_players("4-8") == (4, 8)
+    with pytest.raises(ValueError):
+        S.parse_players("3-8")
+    with pytest.raises(ValueError):
+        S.parse_players("6-5")
+
+
+def test_play_game():
+
+    # Check that a seeded game is reproducible
+    first = S.play_game((0, 7, 4, 8))
+    second = S.play_game((0, 7, 4, 8))
+    assert first == second
+
+    # Check the outcome summary
+    assert 4 <= first['n_players'] <= 8
+    assert len(first['characters']) == first['n_players']
+    assert first['winners']
+    assert all(w in first['characters'] for w in first['winners'])
+
+
+def test_run_batch():
+
+    # Check that every game is played exactly once, in or out of process
+    for workers in [1, 2]:
+        outcomes = list(S.run_batch(20, players=(4, 5), workers=workers))
+        assert sorted(o['game'] for o in outcomes) == list(range(20))
+        assert all(4 <= o['n_players'] <= 5 for o in outcomes)
+
+    # Check that outcomes don't depend on the number of workers
+    serial = {o['game']: o for o in S.run_batch(10, workers=1, seed=3)}
+    pooled = {o['game']: o for o in S.run_batch(10, workers=2, seed=3)}
+    assert serial == pooled
+
+
+def test_main(capsys):
+    S.main(['--games', '3', '--players', '4', '--workers', '1'])
+    out, err = capsys.readouterr()
+    assert len(out.strip().split('\n')) == 3
+    assert 'games/sec' in err
@@ -1,5 +1,10 @@
 import pytest
-from utils import make_hash_sha256
+import copy
+
+from utils import make_hash_sha256, make_patch, apply_patch
+from helpers import fresh_gc_ef, color_format, parse_template, arg_colors
+import helpers as H
+import constants as C
 
 # test_utils.py
 
@@ -12,3 +17,65 @@ def test_make_hash_sha256():
     assert make_hash_sha256(w) == make_hash_sha256(x)
     assert make_hash_sha256(x) != make_hash_sha256(y)
     assert make_hash_sha256(y) != make_hash_sha256(z)
+
+
+def test_patches():
+    gc, ef = fresh_gc_ef()
+    old = gc.dump()[0]
+    old_copy = copy.deepcopy(old)
+
+    # Check that a patch turns a state into the next one
+    p = gc.players[0]
+    p.move(gc.zones[0].areas[0])
+    p.setDamage(3, p)
+    p.equipment.append(H.get_card_by_title(ef, "Talisman"))
+    new = gc.dump()[0]
+    patch = make_patch(old, new)
+    assert 0 < len(patch) < 8
+    assert apply_patch(copy.deepcopy(old), patch) == new
+    assert old == old_copy
+
+    # Check that unchanged states give empty patches
+    assert make_patch(new, gc.dump()[0]) == []
+
+    # Check deletions, replacements and JSON-friendly paths
+    patch = make_patch({'a': [1, 2], 'b': 1}, {'a': [1, 2, 3], 'c': True})
+    assert apply_patch({'a': [1, 2], 'b': 1}, patch) == {
+        'a': [1, 2, 3], 'c': True}
+    assert make_patch({'a': 1}, {'a': True}) == [[['a'], True]]
+    assert apply_patch(1, make_patch(1, [2])) == [2]
+
+
+def test_color_format():
+    gc, ef = fresh_gc_ef()
+    p = gc.players[0]
+
+    # Check that each argument is colored by what it names
+    args = [p.user_id, "Talisman", "Weird Woods", "Shadow", "Allie", 3, "?"]
+    strings, colors = color_format("{} {} {} {} {} {} {}!", args, gc)
+    assert strings == [
+        '', p.user_id, ' ', "Talisman", ' ', "Weird Woods", ' ', "Shadow",
+        ' ', "Allie", ' ', 3, ' ', "?", '!']
+    assert colors[1::2] == [
+        p.color, C.TEXT_COLORS['White'], C.TEXT_COLORS['Weird Woods'],
+        C.TEXT_COLORS['shadow'], C.TEXT_COLORS['neutral'],
+        C.TEXT_COLORS['number'], C.TEXT_COLORS['server']]
+    assert set(colors[::2]) == {C.TEXT_COLORS['server']}
+    assert arg_colors(args, gc) == colors[1::2]
+
+    # Check that players are only colored within a game
+    assert color_format("{}", [p.user_id], None)[1][1] == (
+        C.TEXT_COLORS['server'])
+
+
+def test_parse_template():
+
+    # Check that templates are parsed once, and args are left alone
+    parse_template.cache_clear()
+    args = ["CPU_1", 4]
+    for _ in range(3):
+        strings, colors = color_format("{} rolled a {}", args, None)
+    assert strings == ['', "CPU_1", " rolled a ", 4, '']
+    assert args == ["CPU_1", 4]
+    assert parse_template.cache_info().misses == 1
+    assert parse_template("{} {}") == ('', ' ', '')
@@ -21,3 +21,48 @@ def make_hash_sha256(x):
     hasher = hashlib.sha256()
     hasher.update(repr(make_hashable(x)).encode())
     return base64.b64encode(hasher.digest()).decode()
+
+
+def make_patch(old, new, path=()):
+    """Return the operations that turn old into new, a JSON-like object.
+    [path, value] sets the value at path (a list of keys and indexes), and
+    [path] deletes it. Dicts are diffed key by key and lists of the same
+    length index by index; anything else that differs is replaced whole."""
+    if old is new:
+        return []
+    elif isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for k, v in new.items():
+            if k in old:
+                ops += make_patch(old[k], v, path + (k,))
+            else:
+                ops.append([list(path) + [k], v])
+        ops += [[list(path) + [k]] for k in old if k not in new]
+        return ops
+    elif (isinstance(old, list) and isinstance(new, list) and
+          len(old) == len(new)):
+        ops = []
+        for i, (a, b) in enumerate(zip(old, new)):
+            ops += make_patch(a, b, path + (i,))
+        return ops
+    elif type(old) is type(new) and old == new:
+        return []
+    return [[list(path), new]]
+
+
+def apply_patch(state, patch):
+    """Apply the operations from make_patch() to state (in place, except for
+    replacing the whole state) and return the patched state"""
+    for op in patch:
+        path = op[0]
+        if not path:
+            state = op[1]
+            continue
+        target = state
+        for k in path[:-1]:
+            target = target[k]
+        if len(op) == 2:
+            target[path[-1]] = op[1]
+        else:
+            del target[path[-1]]
+    return state
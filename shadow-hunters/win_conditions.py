@@ -1,19 +1,20 @@
 import constants as C
 
 # win_conditions.py
+# Win conditions read the live/dead counts per allegiance and the order of
+# deaths that the game's GameState keeps up to date, so each check is O(1).
+
+SHADOW = C.Alleg.Shadow.value
+NEUTRAL = C.Alleg.Neutral.value
+HUNTER = C.Alleg.Hunter.value
 
 
 def shadow(gc, player):
 
     # Shadows win if all hunters are dead or 3 neutrals are dead
-    def is_hunter(p): return p.character.alleg == C.Alleg.Hunter
-    def is_neutral(p): return p.character.alleg == C.Alleg.Neutral
-
-    h = [p for p in gc.getLivePlayers() if is_hunter(p)]
-    n = [p for p in gc.getDeadPlayers() if is_neutral(p)]
-
-    no_living_hunters = len(h) == 0
-    neutrals_dead_3 = len(n) >= 3
+    gs = gc.game_state
+    no_living_hunters = gs.live_count[HUNTER] == 0
+    neutrals_dead_3 = gs.dead_count[NEUTRAL] >= 3
 
     return no_living_hunters or neutrals_dead_3
 
@@ -21,11 +22,7 @@ def shadow(gc, player):
 def hunter(gc, player):
 
     # Hunters win if all shadows are dead
-    def is_shadow(p): return p.character.alleg == C.Alleg.Shadow
-
-    s = [p for p in gc.getLivePlayers() if is_shadow(p)]
-
-    no_living_shadows = len(s) == 0
+    no_living_shadows = gc.game_state.live_count[SHADOW] == 0
 
     return no_living_shadows
 
@@ -33,20 +30,20 @@ def hunter(gc, player):
 def allie(gc, player):
 
     # Allie wins if she is still alive when the game ends
-    return (player in gc.getLivePlayers()) and gc.game_over
+    return (player.state != C.PlayerState.Dead) and gc.game_over
 
 
 def bob(gc, player):
 
     # Bob wins if he has 5+ equipment cards
-    return len(player.equipment) >= 5 or player.modifiers["killed_neutral"]
+    return len(player.equipment) >= 5 or player.modifiers.killed_neutral
 
 
 def catherine(gc, player):
 
     # Catherine wins if she is the first to die or one of the last 2 remaining
-    first_to_die = (player in gc.getDeadPlayers()) and (
-        len(gc.getDeadPlayers()) == 1)
-    last_two = (player in gc.getLivePlayers()) and (
-        len(gc.getLivePlayers()) <= 2)
+    gs = gc.game_state
+    is_dead = player.state == C.PlayerState.Dead
+    first_to_die = is_dead and (len(gs.death_order) == 1)
+    last_two = (not is_dead) and (sum(gs.live_count) <= 2)
     return first_to_die or last_two
@@ -5,6 +5,8 @@ from area import Area
 
 
 class Zone:
+    __slots__ = ('areas',)
+
     def __init__(self, areas):
         # Make sure a list is passed to areas
         if not isinstance(areas, list):
@@ -20,5 +22,8 @@ class Zone:
             if not isinstance(c, Area):
                 raise ValueError("One or more areas is not an Area object.")
 
+    def getAdjacent(self, area):
+        return [a for a in self.areas if a != area][0]
+
     def dump(self):
         return [a.dump() for a in self.areas]
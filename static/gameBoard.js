@@ -1,3 +1,29 @@
+//applies a state patch from the server: [path, value] sets the value at
+//path (a list of keys and indexes), and [path] deletes it
+function applyPatch(state, patch) {
+    for(var i = 0; i < patch.length; i++) {
+        var path = patch[i][0];
+        if(path.length === 0) {
+            state = patch[i][1];
+            continue;
+        }
+        var target = state;
+        for(var j = 0; j < path.length - 1; j++) {
+            target = target[path[j]];
+        }
+        if(patch[i].length === 2) {
+            target[path[path.length - 1]] = patch[i][1];
+        }
+        else if(Array.isArray(target)) {
+            target.splice(path[path.length - 1], 1);
+        }
+        else {
+            delete target[path[path.length - 1]];
+        }
+    }
+    return state;
+}
+
 //gameboard scene: this is the actual canvas for the game!
 var GameBoard = new Phaser.Class ({
     Extends: Phaser.Scene,
@@ -20,6 +46,8 @@ var GameBoard = new Phaser.Class ({
         this.otherPlayers = {};
         this.tip;
         this.gameData;
+        this.stateVersion;
+        this.resyncing = false;
         this.charInfo;
         this.infoBox;
         this.popupInfo;
@@ -71,6 +99,7 @@ var GameBoard = new Phaser.Class ({
 
         // Store data
         this.gameData = data;
+        this.stateVersion = data.version;
         if("private" in this.gameData) this.charInfo = this.gameData.private.character;
         this.allPlayersInfo = this.gameData.public.players;
 
@@ -357,9 +386,31 @@ var GameBoard = new Phaser.Class ({
         // Initial update to synchronize spectators
         self.updateBoard(this.gameData.public);
 
-        // Socket receiver for future updates
+        // Socket receiver for future updates, which patch the last version
+        // of the state (or replace it on resyncs)
         socket.on('update', function(data) {
-            self.updateBoard(data);
+            var latest = self.latestVersion || 0;
+            self.latestVersion = Math.max(latest, data.version);
+            if('state' in data) {
+                self.gameData.public = data.state;
+
+                // A resync answered from the registry can be behind the
+                // stream, so then wait for the next whole state instead
+                self.resyncing = data.version < latest;
+            }
+            else if(data.base === self.stateVersion) {
+                self.gameData.public = applyPatch(self.gameData.public, data.patch);
+            }
+            else {
+                // We missed an update, so ask for the whole state
+                if(!self.resyncing) {
+                    self.resyncing = true;
+                    socket.emit('resync');
+                }
+                return;
+            }
+            self.stateVersion = data.version;
+            self.updateBoard(self.gameData.public);
         });
 
         //socet receiver for displaying stuff
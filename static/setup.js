@@ -17,6 +17,120 @@ $('document').ready(function() {
 
     // Initial connection
     socket = io.connect('http://' + document.domain + ':' + location.port, {reconnection: false});
+
+    // Message templates and colors by id, as defined by 'templates' events
+    var templates = {};
+    var palette = {};
+    socket.on('templates', function(data) {
+        $.extend(templates, data.templates);
+        $.extend(palette, data.palette);
+        requestedTemplates = false;
+        releaseMessages(false);
+    });
+
+    // Messages wait (in order) while one of them uses a template or color
+    // that isn't defined yet, which is then asked of the server
+    var heldMessages = [];
+    var requestedTemplates = false;
+    function isDefined(msg) {
+        if(typeof msg.t === 'undefined') {
+            return true;
+        }
+        if(!(msg.t in templates) || !(0 in palette)) {
+            return false;
+        }
+        for(var i = 0; i < msg.c.length; i++) {
+            if(!(msg.c[i] in palette)) {
+                return false;
+            }
+        }
+        return true;
+    }
+    function releaseMessages(request) {
+        while(heldMessages.length && isDefined(heldMessages[0])) {
+            showMessage(heldMessages.shift());
+        }
+        if(heldMessages.length && request && !requestedTemplates) {
+            requestedTemplates = true;
+            socket.emit('templates');
+        }
+    }
+
+    // Expand a templated message into its strings and their colors
+    function expandMessage(msg) {
+        var segments = templates[msg.t];
+        var strings = [segments[0]];
+        var colors = [palette[0]];
+        for(var i = 1; i < segments.length; i++) {
+            strings.push(i <= msg.a.length ? msg.a[i-1] : '');
+            strings.push(segments[i]);
+        }
+        for(var i = 0; i < msg.a.length; i++) {
+            colors.push(palette[msg.c[i]]);
+            colors.push(palette[0]);
+        }
+        return {'strings': strings, 'colors': colors};
+    }
+
+    // Put a message in the chatbox
+    function showMessage(msg) {
+
+        // Expand templated messages
+        if(typeof msg.t !== 'undefined') {
+            msg = expandMessage(msg);
+        }
+
+        // Build message
+        var html = '';
+        if(typeof msg.name !== 'undefined') {
+            html = '<p style="margin:0"><b style="color:'+msg.color+'">'+msg.name+'</b> '+msg.data+'</p>';
+        }
+        else {
+            html = '<p style="margin:0">';
+            for(var i = 0; i < msg.strings.length; i++) {
+                html += '<b style="color:'+msg.colors[i]+'">'+msg.strings[i]+'</b>';
+            }
+            html += '</p>';
+        }
+
+        // Put message in chatbox and snap to bottom if already at bottom
+        var chat = $("#message_holder");
+        if (chat.scrollTop() == chat[0].scrollHeight - chat[0].clientHeight) {
+            chat.append(html);
+            chat.scrollTop(chat[0].scrollHeight);
+        }
+        else {
+            chat.append(html);
+        }
+    }
+
+    // Frames batch the events of a room: hand each one to its handlers, in
+    // order, pausing after each display so that rolls, damage and deaths
+    // batched into one frame play one after another
+    var DISPLAY_DELAY = 600;
+    var queued = [];
+    var playing = false;
+    function playQueued() {
+        while(queued.length) {
+            var event = queued.shift();
+            var handlers = socket.listeners(event[0]);
+            for(var j = 0; j < handlers.length; j++) {
+                handlers[j](event[1]);
+            }
+            if(event[0] == 'display' && queued.length) {
+                setTimeout(playQueued, DISPLAY_DELAY);
+                return;
+            }
+        }
+        playing = false;
+    }
+    socket.on('frame', function(frame) {
+        queued = queued.concat(frame);
+        if(!playing) {
+            playing = true;
+            playQueued();
+        }
+    });
     socket.on('connect', function() {
 
         // User joins the room
@@ -53,7 +167,10 @@ $('document').ready(function() {
         // Form type 1
         var confirm_form = $('#confirm').on('submit', function(e) {
             e.preventDefault();
-            socket.emit('answer', { 'value': $('#confirm [name="inputs"][clicked=true]').val() });
+            socket.emit('answer', {
+                'value': $('#confirm [name="inputs"][clicked=true]').val(),
+                'ask_id': $('#confirm').data('ask_id')
+            });
             $('#confirm').hide();
             $('#confirm').empty();
         });
@@ -61,7 +178,10 @@ $('document').ready(function() {
         // Form type 2
         var yesno_form = $('#yesno').on('submit', function(e) {
             e.preventDefault();
-            socket.emit('answer', { 'value': $('#yesno [name="inputs"][clicked=true]').val() });
+            socket.emit('answer', {
+                'value': $('#yesno [name="inputs"][clicked=true]').val(),
+                'ask_id': $('#yesno').data('ask_id')
+            });
             $('#yesno').hide();
             $('#yesno').empty();
         });
@@ -69,36 +189,18 @@ $('document').ready(function() {
         // Form type 3
         var select_form = $('#select').on('submit', function(e) {
             e.preventDefault();
-            socket.emit('answer', { 'value': $('#select [name="inputs"][clicked=true]').val() });
+            socket.emit('answer', {
+                'value': $('#select [name="inputs"][clicked=true]').val(),
+                'ask_id': $('#select').data('ask_id')
+            });
             $('#select').hide();
             $('#select').empty();
         });
 
         // Receive a message
         socket.on('message', function(msg) {
-
-            // Build message
-            var html = '';
-            if(typeof msg.name !== 'undefined') {
-                html = '<p style="margin:0"><b style="color:'+msg.color+'">'+msg.name+'</b> '+msg.data+'</p>';
-            }
-            else {
-                html = '<p style="margin:0">';
-                for(var i = 0; i < msg.strings.length; i++) {
-                    html += '<b style="color:'+msg.colors[i]+'">'+msg.strings[i]+'</b>';
-                }
-                html += '</p>';
-            }
-
-            // Put message in chatbox and snap to bottom if already at bottom
-            var chat = $("#message_holder");
-            if (chat.scrollTop() == chat[0].scrollHeight - chat[0].clientHeight) {
-                chat.append(html);
-                chat.scrollTop(chat[0].scrollHeight);
-            }
-            else {
-                chat.append(html);
-            }
+            heldMessages.push(msg);
+            releaseMessages(true);
         });
 
         // Receive an ask
@@ -127,6 +229,9 @@ $('document').ready(function() {
             }
             $('#'+data.form).append(option);
 
+            // Remember which ask the answer will be for
+            $('#'+data.form).data('ask_id', data.ask_id);
+
             // Add click handler to each button
             $('form [name="inputs"]').click(function() {
                 $('[name="inputs"]', $(this).parents("form")).removeAttr("clicked");